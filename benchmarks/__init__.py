@@ -0,0 +1,16 @@
+"""Замеры времени вычислительных и графических горячих участков.
+
+Замеры выполняются без окна: matplotlib переключается на Agg, приложения
+создаются без Tk (harness.headless), а холст FigureCanvasTkAgg заменяется
+холстом Agg, поэтому отрисовка измеряется честно, но экран не нужен.
+Каждый замер параметризован размером (число точек, шагов, маятников,
+плотность линий тока), результаты пишутся в JSON и сравниваются между
+коммитами.
+
+Запуск из корня репозитория:
+    python -m benchmarks.run run                       # все замеры, bench_<коммит>.json
+    python -m benchmarks.run run -k maps --max-size 1e6
+    python -m benchmarks.run list
+    python -m benchmarks.run compare bench_old.json bench_new.json
+Переменная окружения DYNAMICS_JIT=0 отключает numba (путь NumPy).
+"""
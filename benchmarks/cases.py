@@ -0,0 +1,211 @@
+"""Замеры: интегрирование, кадры приложений и итерации отображений.
+
+Приложения создаются через harness.headless с теми же параметрами, что
+задают их конструкторы, поэтому замеряются их собственные методы.
+"""
+import itertools
+
+import numpy as np
+from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+from benchmarks.harness import HeadlessCanvas, Value, case, headless, load_script
+from dynamics.jit import henon_orbit, zaslavsky_orbit
+from dynamics.maps import henon, ikeda, mirror, workspace
+from dynamics.orbit import long_orbit
+from dynamics.rk4 import solve_lorenz
+
+MAP_SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+
+
+def random_cloud(xlim, ylim, size, seed=0):
+    """Облако (2, size) равномерно распределенных точек прямоугольника"""
+    rng = np.random.default_rng(seed)
+    cloud = np.empty((2, size))
+    cloud[0] = rng.uniform(*xlim, size)
+    cloud[1] = rng.uniform(*ylim, size)
+    return cloud
+
+
+@case('rk4.solve_lorenz', (10**3, 10**4, 10**5, 10**6), 'шагов')
+def rk4_solve_lorenz(size):
+    # Одна траектория: последовательный цикл RK4 (numba, если доступен)
+    h = 0.01
+    return lambda: solve_lorenz(28.0, (1.0, 1.0, 1.0), 0.0, size * h, h)
+
+
+@case('lorenz_app.update_plot', (4000, 40000, 400000), 'точек')
+def lorenz_update_plot(size):
+    # Оси и коллекция как в LorenzApp.create_widgets; шаг по времени как в приложении
+    module = load_script('chapter 4/4_3_a.py')
+    fig = Figure(figsize=(6, 6))
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_xlim((-25, 25))
+    ax.set_ylim((-35, 35))
+    ax.set_zlim((0, 50))
+    lines = Line3DCollection([], cmap='plasma', linewidths=1.0)
+    ax.add_collection3d(lines, autolim=False)
+    fig.colorbar(lines, ax=ax, label='Температура (z)')
+    app, loop = headless(module.LorenzApp, sigma=10.0, beta=1.0, rho=28.0,
+                         t=np.linspace(0, size / 100, size), initial_state=[1.0, 1.0, 1.0],
+                         segment_points=8, frame_budget=0.015, stream=None, stream_job=None,
+                         fig=fig, ax=ax, lines=lines, canvas=HeadlessCanvas(fig))
+
+    def run():
+        # Весь поток блоков odeint с промежуточными перерисовками
+        app.update_plot()
+        loop.run()
+    return run
+
+
+@case('pendulum_app.update', (2, 100, 1000, 10000), 'маятников')
+def pendulum_update(size):
+    # 2 - пара маятников (update), больше - ансамбль (update_ensemble)
+    module = load_script('chapter 4/4_32.py')
+    app, _ = headless(module.DoublePendulumApp, master=None,
+                      pendulum1=module.DoublePendulum(color='blue'),
+                      pendulum2=module.DoublePendulum(color='green'),
+                      trail_length=500, trail1=module.TrailBuffer(500),
+                      trail2=module.TrailBuffer(500), ensemble=None,
+                      ensemble_trail_length=100, anim=None)
+    app.setup_plot()
+    if size == 2:
+        update, artists = app.update, app.init_animation()
+    else:
+        app.__dict__.update(ensemble_size=Value(size), ensemble_spread=Value(0.1),
+                            L1_label={'text': '1.0'}, L2_label={'text': '1.0'},
+                            theta1_label={'text': '90'}, theta2_label={'text': '90'})
+        app.setup_ensemble()
+        update, artists = app.update_ensemble, app.init_ensemble()
+    for artist in artists:
+        artist.set_animated(True)
+    app.canvas.draw()
+    background = app.canvas.copy_from_bbox(app.ax.bbox)
+    frames = itertools.count()
+
+    def run():
+        # Кадр FuncAnimation с blit: фон, обновленные объекты, перенос на холст
+        app.canvas.restore_region(background)
+        for artist in update(next(frames)):
+            app.ax.draw_artist(artist)
+        app.canvas.blit(app.ax.bbox)
+    return run
+
+
+@case('henon_app.henon_map', MAP_SIZES, 'точек')
+def henon_map(size):
+    module = load_script('chapter 3 task 90/Отображение_Эно.py')
+    initial = random_cloud((-0.5, 0.5), (-0.5, 0.5), size)
+    cloud = initial.copy()
+    app, _ = headless(module.HenonApp, λ=1.4, b=0.3, work=workspace(henon, cloud))
+
+    def run():
+        with np.errstate(over='ignore', invalid='ignore'):
+            app.henon_map(cloud)
+    return run, lambda: np.copyto(cloud, initial)
+
+
+@case('zaslavsky_app.zaslavsky_map', MAP_SIZES, 'точек')
+def zaslavsky_map(size):
+    module = load_script('chapter 3 task 90/Заславский.py')
+    initial = random_cloud((0, 2*np.pi), (-5, 15), size)
+    cloud = initial.copy()
+    app, _ = headless(module.ZaslavskyApp, K=5.0, gamma=0.1, omega=0.618, work=None)
+    return lambda: app.zaslavsky_map(cloud), lambda: np.copyto(cloud, initial)
+
+
+@case('orbit.long_orbit.henon', MAP_SIZES, 'точек')
+def henon_long_orbit(size):
+    # Одна орбита последовательным циклом, как в окне «Аттрактор» (параметры по умолчанию)
+    return lambda: long_orbit(henon_orbit, (0.1, 0.1), (1.4, 0.3), n_points=size)
+
+
+@case('orbit.long_orbit.zaslavsky', MAP_SIZES, 'точек')
+def zaslavsky_long_orbit(size):
+    return lambda: long_orbit(zaslavsky_orbit, (1.0, 0.0), (5.0, 0.1, 0.618), n_points=size)
+
+
+@case('ikeda_app.iterate_system', MAP_SIZES, 'точек')
+def ikeda_iterate(size):
+    module = load_script('chapter 3 task 90/Икеда.py')
+    initial = random_cloud((-2, 2), (-2, 2), size)
+    app, _ = headless(module.IkedaAppRealParams, A=Value(1.0), B=Value(0.9),
+                      compact_every=10)
+
+    def reset():
+        app.points = initial.copy()
+        app.work = workspace(ikeda, app.points)
+        app.current_iter = 0
+        app.diverged = 0
+    reset()
+    return app.iterate_system, reset
+
+
+@case('mirror_app.iterate_system', MAP_SIZES, 'точек')
+def mirror_iterate(size):
+    module = load_script('chapter 3 task 90/ТЛЛ.py')
+    initial = random_cloud((0, 2*np.pi), (0, 2*np.pi), size)
+    app, _ = headless(module.MirrorMapApp, z=Value(1.0), h=Value(0.5), compact_every=10)
+
+    def reset():
+        app.points = initial.copy()
+        app.work = workspace(mirror, app.points)
+        app.current_iter = 0
+        app.diverged = 0
+    reset()
+    return app.iterate_system, reset
+
+
+STREAM_DENSITIES = (5, 10, 15, 30)
+
+
+def bifurcation_app(density):
+    """BifurcationApp с ветвями равновесий как в конструкторе и кешами линий тока плотности density"""
+    module = load_script('chapter 3/3_20.py')
+    seeds = np.stack(np.meshgrid(np.linspace(-3, 3, 13), np.linspace(-1.5, 1.5, 7)),
+                     axis=-1).reshape(-1, 2)
+    app, loop = headless(
+        module.BifurcationApp, mu=0.0, y_sign=-1, refine_pending=False, plot_frame=None,
+        saddle_branches=module.trace_branches(module.saddle_node_derivs,
+                                              module.saddle_node_jacobian, seeds, (-1.0, 1.0),
+                                              args=(-1,)),
+        pitchfork_branches=module.trace_branches(module.pitchfork_derivs,
+                                                 module.pitchfork_jacobian, seeds, (-1.0, 1.0)))
+
+    def clear_caches():
+        app.saddle_streams = module.StreamlineCache(module.saddle_node_derivs, (-3, 3),
+                                                    (-1.5, 1.5), args=(app.y_sign,),
+                                                    density=density)
+        app.pitchfork_streams = module.StreamlineCache(module.pitchfork_derivs, (-2, 2),
+                                                       (-1, 1), density=density)
+    clear_caches()
+    app.init_plots()
+    return app, clear_caches
+
+
+# Размер - плотность линий тока streamplot, умноженная на 10 (в приложении 1.5);
+# от нее зависит число линий и стрелок, а от сетки поля время почти не зависит
+@case('streamcache.streamline_geometry', STREAM_DENSITIES, 'плотность ×10')
+def bifurcation_geometry(size):
+    # Только расчет геометрии обеих панелей, без осей приложения
+    app, _ = bifurcation_app(size / 10)
+
+    def run():
+        app.saddle_streams.compute(app.mu)
+        app.pitchfork_streams.compute(app.mu)
+    return run
+
+
+@case('bifurcation_app.update_plots.streamplot', STREAM_DENSITIES, 'плотность ×10')
+def bifurcation_streamplot(size):
+    # Пустой кеш: геометрия обеих панелей считается заново и рисуется
+    app, clear_caches = bifurcation_app(size / 10)
+    return app.update_plots, clear_caches
+
+
+@case('bifurcation_app.update_plots.cached', STREAM_DENSITIES, 'плотность ×10')
+def bifurcation_cached(size):
+    # Геометрия уже в кеше: только добавление готовых линий и отрисовка
+    # (при малой плотности преобладают tight_layout и легенды)
+    app, _ = bifurcation_app(size / 10)
+    return app.update_plots
@@ -0,0 +1,167 @@
+"""Измерение времени и запуск приложений без окна."""
+import functools
+import importlib.util
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Зарегистрированные замеры в порядке объявления
+CASES = []
+
+
+class Case:
+    def __init__(self, name, setup, sizes, unit):
+        """
+        - setup(size): подготовка, не входящая в замер; возвращает функцию
+          run() или пару (run, before), где before() вызывается перед каждым
+          повтором вне замера (например, восстанавливает исходное облако)
+        - sizes: размеры по умолчанию; unit - что считает размер
+        """
+        self.name = name
+        self.setup = setup
+        self.sizes = sizes
+        self.unit = unit
+
+
+def case(name, sizes, unit):
+    """Декоратор, регистрирующий функцию подготовки замера"""
+    def register(setup):
+        CASES.append(Case(name, setup, tuple(sizes), unit))
+        return setup
+    return register
+
+
+def measure(run, before=None, min_time=0.2, min_repeat=3, max_repeat=200):
+    """
+    Времена повторов run(): первый вызов - прогрев (компиляция numba, кеши
+    matplotlib) и в статистику не входит; повторы идут, пока их меньше
+    min_repeat или суммарное время меньше min_time (не больше max_repeat).
+    """
+    if before is not None:
+        before()
+    run()
+    times = []
+    while len(times) < min_repeat or (sum(times) < min_time and len(times) < max_repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {'repeat': len(times), 'min': min(times), 'median': statistics.median(times),
+            'mean': statistics.fmean(times), 'max': max(times)}
+
+
+@functools.lru_cache(maxsize=None)
+def load_script(relative_path):
+    """Модуль приложения из файла репозитория (имена папок с пробелами не импортируются)"""
+    path = ROOT / relative_path
+    name = 'bench_' + path.stem
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Холст приложения рисует в буфер Agg
+    if hasattr(module, 'FigureCanvasTkAgg'):
+        module.FigureCanvasTkAgg = HeadlessCanvas
+    return module
+
+
+class Widget:
+    """Заглушка виджета Tk: упаковка и настройка ничего не делают"""
+    def pack(self, *args, **kwargs):
+        pass
+
+    config = configure = pack
+
+
+class Value:
+    """Значение вместо tk.IntVar/DoubleVar/StringVar"""
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class HeadlessCanvas(FigureCanvasAgg):
+    """FigureCanvasTkAgg без окна: draw и draw_idle рисуют в буфер Agg"""
+    def __init__(self, figure, master=None):
+        super().__init__(figure)
+
+    def get_tk_widget(self):
+        return Widget()
+
+
+class EventLoop:
+    """Очередь вызовов after вместо цикла событий Tk; задержки не выдерживаются"""
+    def __init__(self):
+        self.pending = {}
+        self.next_job = 0
+
+    def after(self, ms, func, *args):
+        self.next_job += 1
+        self.pending[self.next_job] = (func, args)
+        return self.next_job
+
+    def after_cancel(self, job):
+        self.pending.pop(job, None)
+
+    def run(self):
+        """Выполнение отложенных вызовов, пока очередь не опустеет"""
+        while self.pending:
+            func, args = self.pending.pop(min(self.pending))
+            func(*args)
+
+
+def headless(cls, **attrs):
+    """
+    Экземпляр приложения без вызова __init__ (без Tk): атрибуты, которые
+    задал бы конструктор, передаются в attrs. Возвращает (app, loop), где
+    loop - EventLoop, принимающий вызовы app.after.
+    """
+    app = cls.__new__(cls)
+    loop = EventLoop()
+    app.__dict__.update(attrs, after=loop.after, after_cancel=loop.after_cancel)
+    return app, loop
+
+
+def _version(name):
+    try:
+        return __import__(name).__version__
+    except ImportError:
+        return None
+
+
+def environment():
+    """Сведения о машине, версиях библиотек и коммите для файла результатов"""
+    from dynamics import jit
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': _version('numpy'),
+        'scipy': _version('scipy'),
+        'matplotlib': _version('matplotlib'),
+        'numba': _version('numba'),
+        'jit': jit.ENABLED,
+    }
@@ -0,0 +1,109 @@
+"""Запуск замеров и сравнение файлов результатов (см. benchmarks/__init__.py)."""
+import argparse
+import fnmatch
+import gc
+import json
+
+from benchmarks import cases  # noqa: F401 - регистрация замеров
+from benchmarks.harness import CASES, environment, measure
+
+
+def selected(pattern=None):
+    """Замеры, в имени которых есть pattern (допускаются шаблоны * и ?)"""
+    if pattern is None:
+        return list(CASES)
+    if not any(c in pattern for c in '*?['):
+        pattern = f'*{pattern}*'
+    return [c for c in CASES if fnmatch.fnmatch(c.name, pattern)]
+
+
+def run_cases(chosen, sizes=None, max_size=None, min_time=0.2, report=print):
+    """Список результатов {'name', 'size', 'unit', 'repeat', 'min', 'median', 'mean', 'max'}"""
+    results = []
+    for bench in chosen:
+        for size in sizes or bench.sizes:
+            if max_size is not None and size > max_size:
+                continue
+            prepared = bench.setup(size)
+            run, before = prepared if isinstance(prepared, tuple) else (prepared, None)
+            timing = measure(run, before, min_time=min_time)
+            del prepared, run, before
+            gc.collect()
+            result = dict(name=bench.name, size=size, unit=bench.unit, **timing)
+            results.append(result)
+            report(f"{bench.name:<42} {size:>10} {bench.unit:<17} "
+                   f"{timing['median']*1e3:>10.3f} мс  (min {timing['min']*1e3:.3f}, "
+                   f"повторов {timing['repeat']})")
+    return results
+
+
+def compare(old, new, threshold=0.1, report=print):
+    """
+    Сравнение медиан двух файлов результатов по (name, size). Возвращает
+    число замедлений больше чем на threshold (доля).
+    """
+    before = {(r['name'], r['size']): r for r in old['results']}
+    slower = 0
+    for r in new['results']:
+        key = (r['name'], r['size'])
+        if key not in before:
+            continue
+        ratio = r['median'] / before[key]['median']
+        mark = ''
+        if ratio > 1 + threshold:
+            mark = '  медленнее'
+            slower += 1
+        elif ratio < 1 - threshold:
+            mark = '  быстрее'
+        report(f"{r['name']:<42} {r['size']:>10} {before[key]['median']*1e3:>10.3f} -> "
+               f"{r['median']*1e3:>10.3f} мс  x{ratio:.2f}{mark}")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры горячих участков без окна")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="выполнить замеры и записать JSON")
+    run.add_argument('-k', dest='pattern', help="только замеры, в имени которых есть подстрока")
+    run.add_argument('--sizes', type=float, nargs='+', help="размеры вместо заданных в замерах")
+    run.add_argument('--max-size', type=float, help="пропустить размеры больше этого (например 1e6)")
+    run.add_argument('--min-time', type=float, default=0.2,
+                     help="минимальное суммарное время повторов одного замера, с")
+    run.add_argument('-o', '--output', help="файл результатов (по умолчанию bench_<коммит>.json)")
+    commands.add_parser('list', help="список замеров и размеров")
+    diff = commands.add_parser('compare', help="сравнить два файла результатов")
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=0.1,
+                      help="допустимое относительное изменение медианы")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for bench in CASES:
+            print(f"{bench.name:<42} {bench.unit}: {', '.join(str(s) for s in bench.sizes)}")
+    elif args.command == 'run':
+        chosen = selected(args.pattern)
+        if not chosen:
+            parser.error(f"нет замеров по шаблону {args.pattern!r}")
+        sizes = [int(s) for s in args.sizes] if args.sizes else None
+        env = environment()
+        results = run_cases(chosen, sizes, args.max_size, args.min_time)
+        output = args.output or f"bench_{(env['commit'] or 'local')[:10]}.json"
+        with open(output, 'w') as f:
+            json.dump({'environment': env, 'results': results}, f, ensure_ascii=False, indent=1)
+        print(f"Результаты: {output}")
+    else:
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        # Результаты сравнимы только на одной машине и с одинаковым бэкендом
+        for key in ('commit', 'platform', 'cpu_count', 'jit'):
+            a, b = old['environment'].get(key), new['environment'].get(key)
+            print(f"{key}: {a}" if a == b else f"{key}: {a} -> {b}")
+        slower = compare(old, new, args.threshold)
+        print(f"Замедлений больше {args.threshold:.0%}: {slower}")
+
+
+if __name__ == '__main__':
+    main()
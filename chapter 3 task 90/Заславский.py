@@ -1,9 +1,20 @@
+import argparse
+import sys
+import threading
+from pathlib import Path
 import numpy as np
 import tkinter as tk
 from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.export import MapScene, add_map_arguments, export_from_args
+from dynamics.jit import zaslavsky_orbit
+from dynamics.maps import grid_cloud, workspace, zaslavsky
+from dynamics.orbit import long_orbit, plot_orbit_density
+from dynamics.raster import SCALES, DensityRaster
+
 class ZaslavskyApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -16,6 +27,9 @@ class ZaslavskyApp(tk.Tk):
         self.omega = 0.618
         self.running = False
         self.points = self.generate_cloud()
+        self.work = None
+        # Число точек одной орбиты в окне аттрактора
+        self.attractor_points = 10**6
         
         # Создание элементов интерфейса
         self.create_widgets()
@@ -31,6 +45,18 @@ class ZaslavskyApp(tk.Tk):
         self.gamma_slider, self.gamma_label = self.create_param_slider(control_frame, "γ:", 0.0, 1.0, self.gamma)
         self.omega_slider, self.omega_label = self.create_param_slider(control_frame, "Ω:", 0.1, 2.0, self.omega)
         
+        # Режим плотности: облако рисуется как изображение гистограммы
+        self.density_mode = tk.BooleanVar(value=False)
+        self.density_scale = tk.StringVar(value='log')
+        density_frame = ttk.Frame(control_frame)
+        density_frame.pack(fill=tk.X, pady=5)
+        ttk.Checkbutton(density_frame, text="Плотность", variable=self.density_mode,
+                        command=self.show_points).pack(side=tk.LEFT)
+        scale_box = ttk.Combobox(density_frame, values=SCALES, textvariable=self.density_scale,
+                                 state='readonly', width=9)
+        scale_box.pack(side=tk.RIGHT)
+        scale_box.bind("<<ComboboxSelected>>", lambda e: self.show_points())
+        
         # Информация о системе
         self.info_label = ttk.Label(control_frame, text="", wraplength=200)
         self.info_label.pack(pady=10)
@@ -44,6 +70,9 @@ class ZaslavskyApp(tk.Tk):
         
         self.reset_btn = ttk.Button(self.btn_frame, text="Сброс", command=self.reset)
         self.reset_btn.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(control_frame, text="Аттрактор",
+                   command=self.show_attractor).pack(fill=tk.X)
 
     def create_param_slider(self, parent, label, min_val, max_val, init_val):
         frame = ttk.Frame(parent)
@@ -69,21 +98,20 @@ class ZaslavskyApp(tk.Tk):
         self.ax.set_xlabel("θ")
         self.ax.set_ylabel("p")
         self.scat = self.ax.scatter([], [], s=1, c='blue')
+        self.raster = DensityRaster((0, 2*np.pi, -5, 15))
+        self.raster.attach(self.ax).set_visible(False)
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
     def generate_cloud(self, num=50):
-        theta = np.linspace(0, 2*np.pi, num)
-        p = np.linspace(-5, 15, num)
-        Theta, P = np.meshgrid(theta, p)
-        return np.column_stack((Theta.ravel(), P.ravel()))
+        return grid_cloud((0, 2*np.pi), (-5, 15), num)
 
     def zaslavsky_map(self, points):
-        theta, p = points[:, 0], points[:, 1]
-        new_p = (1 - self.gamma)*p + self.K*np.sin(theta) + self.omega
-        new_theta = (theta + new_p) % (2*np.pi)
-        return np.column_stack((new_theta, new_p))
+        # Итерация на месте; рабочий массив выделяется заново только при смене облака
+        if self.work is None or self.work.shape[1] != points.shape[1]:
+            self.work = workspace(zaslavsky, points)
+        return zaslavsky(points, self.K, self.gamma, self.omega, work=self.work)
 
     def update_param(self, label, value):
         label.config(text=f"{float(value):.2f}")
@@ -109,17 +137,81 @@ class ZaslavskyApp(tk.Tk):
     def animate(self):
         if self.running:
             self.points = self.zaslavsky_map(self.points)
-            self.scat.set_offsets(self.points)
-            self.canvas.draw_idle()
+            self.show_points()
             self.after(50, self.animate)
 
+    def show_attractor(self):
+        # Одна длинная орбита (numba, если доступен) как изображение плотности
+        K, gamma, omega = self.K, self.gamma, self.omega
+        window = tk.Toplevel(self)
+        window.title(f"Аттрактор Заславского (K = {K:.2f}, γ = {gamma:.2f}, Ω = {omega:.2f})")
+        fig = Figure(figsize=(8, 8))
+        ax = fig.add_subplot(111)
+        ax.set_xlabel("θ")
+        ax.set_ylabel("p")
+        ax.set_title("Расчет...")
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+        result = {}
+
+        def compute():
+            try:
+                result['points'] = long_orbit(zaslavsky_orbit, (1.0, 0.0), (K, gamma, omega),
+                                              n_points=self.attractor_points)
+            except Exception as error:
+                result['error'] = error
+
+        def poll():
+            if worker.is_alive():
+                window.after(100, poll)
+                return
+            if 'error' in result:
+                ax.set_title(f"Ошибка: {result['error']}")
+            elif plot_orbit_density(ax, result['points']):
+                ax.set_title(f"Аттрактор (K = {K:.2f}, γ = {gamma:.2f}, Ω = {omega:.2f}), "
+                             f"{len(result['points'])} точек")
+            else:
+                ax.set_title("Орбита ушла на бесконечность")
+            canvas.draw()
+
+        worker = threading.Thread(target=compute, daemon=True)
+        worker.start()
+        poll()
+
     def reset(self):
         self.running = False
         self.start_btn.config(text="Старт")
         self.points = self.generate_cloud()
-        self.scat.set_offsets(self.points)
+        self.show_points()
+
+    def show_points(self):
+        # Отрисовка облака точками или изображением плотности
+        density = self.density_mode.get()
+        self.scat.set_visible(not density)
+        self.raster.image.set_visible(density)
+        if density:
+            self.raster.scale = self.density_scale.get()
+            self.raster.update(*self.points)
+        else:
+            self.scat.set_offsets(self.points.T)
         self.canvas.draw_idle()
 
 if __name__ == "__main__":
-    app = ZaslavskyApp()
-    app.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Гравитационная машина Заславского")
+    group = add_map_arguments(parser)
+    group.add_argument('--K', type=float, default=5.0, help="параметр K")
+    group.add_argument('--gamma', type=float, default=0.1, help="диссипация γ")
+    group.add_argument('--omega', type=float, default=0.618, help="параметр Ω")
+    group.add_argument('--cloud-size', type=int, default=50, help="точек на сторону сетки")
+    args = parser.parse_args()
+    
+    if args.export:
+        scene = MapScene(zaslavsky, (args.K, args.gamma, args.omega), (0, 2*np.pi, -5, 15),
+                         title="Фазовое пространство системы Заславского",
+                         density=args.density, scale=args.scale,
+                         steps_per_frame=args.steps_per_frame, xlabel="θ", ylabel="p")
+        export_from_args(args, scene, grid_cloud((0, 2*np.pi), (-5, 15), args.cloud_size, args.dtype))
+    else:
+        app = ZaslavskyApp()
+        app.mainloop()
\ No newline at end of file
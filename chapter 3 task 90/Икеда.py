@@ -1,9 +1,21 @@
+import argparse
+import sys
+import threading
+from pathlib import Path
 import tkinter as tk
 from tkinter import ttk
 import numpy as np
 import cmath
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.basins import basin_image, escape_basins, periodic_attractors
+from dynamics.blit import BlitManager
+from dynamics.export import MapScene, add_map_arguments, export_from_args
+from dynamics.maps import compact, grid_cloud, ikeda, workspace
+from dynamics.raster import SCALES, DensityRaster
 
 class IkedaAppRealParams:
     def __init__(self, master):
@@ -26,6 +38,15 @@ class IkedaAppRealParams:
         self.points = None
         self.current_iter = 0
         self.anim_running = False
+        # Разошедшиеся точки (inf/NaN) выбрасываются раз в compact_every итераций
+        self.compact_every = 10
+        self.diverged = 0
+        self.density_mode = tk.BooleanVar(value=False)
+        self.density_scale = tk.StringVar(value='log')
+        self.raster = DensityRaster((-5, 5, -5, 5))
+        # Бассейны: сетка начальных условий той же области, что и облако
+        self.basin_resolution = tk.IntVar(value=1024)
+        self.basin_iterations = 500
 
     def create_widgets(self):
         """Создание элементов интерфейса"""
@@ -57,12 +78,24 @@ class IkedaAppRealParams:
         ttk.Label(control_frame, text="Высота:").pack()
         ttk.Entry(control_frame, textvariable=self.height).pack()
 
+        # Режим плотности: облако рисуется как изображение гистограммы
+        ttk.Checkbutton(control_frame, text="Плотность", variable=self.density_mode,
+                        command=self.update_plot).pack(pady=(5, 0))
+        scale_box = ttk.Combobox(control_frame, values=SCALES, textvariable=self.density_scale,
+                                 state='readonly', width=9)
+        scale_box.pack()
+        scale_box.bind("<<ComboboxSelected>>", lambda e: self.update_plot())
+
         # Кнопки управления
         ttk.Button(control_frame, text="Обновить", command=self.generate_points).pack(pady=5)
         ttk.Button(control_frame, text="Старт", command=self.start_animation).pack(pady=5)
         ttk.Button(control_frame, text="Стоп", command=self.stop_animation).pack(pady=5)
         ttk.Button(control_frame, text="Сброс", command=self.reset).pack(pady=5)
 
+        ttk.Label(control_frame, text="Разрешение бассейнов:").pack()
+        ttk.Entry(control_frame, textvariable=self.basin_resolution).pack()
+        ttk.Button(control_frame, text="Бассейны", command=self.show_basins).pack(pady=5)
+
         # Настройка графика
         self.fig, self.ax = plt.subplots(figsize=(8, 8))
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
@@ -70,39 +103,107 @@ class IkedaAppRealParams:
         self.ax.set_xlim(-5, 5)
         self.ax.set_ylim(-5, 5)
 
+        # Постоянные элементы графика: на кадре меняются только их данные
+        self.scat = self.ax.scatter([], [], s=1, c='blue')
+        self.raster.attach(self.ax).set_visible(False)
+        self.title = self.ax.set_title('')
+        self.blit = BlitManager(self.canvas, (self.raster.image, self.scat, self.title))
+
     def generate_points(self):
         """Генерация начального облака точек"""
         size = self.grid_size.get()
-        x = np.linspace(
-            self.center_x.get() - self.width.get()/2,
-            self.center_x.get() + self.width.get()/2,
-            size
-        )
-        y = np.linspace(
-            self.center_y.get() - self.height.get()/2,
-            self.center_y.get() + self.height.get()/2,
-            size
-        )
-        X, Y = np.meshgrid(x, y)
-        self.points = X.flatten() + 1j*Y.flatten()
+        xlim = (self.center_x.get() - self.width.get()/2, self.center_x.get() + self.width.get()/2)
+        ylim = (self.center_y.get() - self.height.get()/2, self.center_y.get() + self.height.get()/2)
+        # Облако (2, N): Re z и Im z; итерируется на месте
+        self.points = grid_cloud(xlim, ylim, size)
+        self.work = workspace(ikeda, self.points)
         self.current_iter = 0
+        self.diverged = 0
         self.update_plot()
 
     def iterate_system(self):
         """Одна итерация системы Икеды"""
-        A = self.A.get()
-        B = self.B.get()
-        self.points = A + B * self.points * np.exp(1j * np.abs(self.points)**2)
+        with np.errstate(over='ignore', invalid='ignore'):
+            ikeda(self.points, self.A.get(), self.B.get(), work=self.work[:, :self.points.shape[1]])
         self.current_iter += 1
+        if self.current_iter % self.compact_every == 0:
+            self.points, dropped = compact(self.points)
+            self.diverged += dropped
 
     def update_plot(self):
         """Обновление графика"""
-        self.ax.clear()
-        self.ax.scatter(np.real(self.points), np.imag(self.points), s=1, c='blue')
-        self.ax.set_title(f'Итерация: {self.current_iter}')
-        self.ax.set_xlim(-5, 5)
-        self.ax.set_ylim(-5, 5)
-        self.canvas.draw()
+        density = self.density_mode.get()
+        self.scat.set_visible(not density)
+        self.raster.image.set_visible(density)
+        if density:
+            self.raster.scale = self.density_scale.get()
+            self.raster.update(*self.points)
+        else:
+            self.scat.set_offsets(self.points.T)
+        title = f'Итерация: {self.current_iter}'
+        if self.diverged:
+            title += f', разошлось точек: {self.diverged}'
+        self.title.set_text(title)
+        self.blit.update()
+
+    def show_basins(self):
+        """Бассейны притягивающих циклов в отдельном окне; расчет в фоновом потоке"""
+        A, B = self.A.get(), self.B.get()
+        resolution = max(2, self.basin_resolution.get())
+        xlim = (self.center_x.get() - self.width.get()/2, self.center_x.get() + self.width.get()/2)
+        ylim = (self.center_y.get() - self.height.get()/2, self.center_y.get() + self.height.get()/2)
+
+        window = tk.Toplevel(self.master)
+        window.title(f"Бассейны притяжения (A = {A:.2f}, B = {B:.2f})")
+        fig = Figure(figsize=(8, 8))
+        ax = fig.add_subplot(111)
+        ax.set_title("Поиск циклов...")
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+        result = {'done': 0, 'total': 0}
+
+        def report(done, total):
+            result['done'], result['total'] = done, total
+
+        def compute():
+            try:
+                cycles = periodic_attractors(ikeda, (A, B), xlim, ylim)
+                result['cycles'] = cycles
+                result['labels'] = escape_basins(ikeda, (A, B), xlim, ylim, (resolution, resolution),
+                                                 max_iter=self.basin_iterations, escape_radius=1e3,
+                                                 attractors=cycles, progress=report)
+            except Exception as error:
+                result['error'] = error
+
+        def poll():
+            if worker.is_alive():
+                if result['total']:
+                    ax.set_title(f"Расчет: {result['done']}/{result['total']} плиток")
+                    canvas.draw_idle()
+                window.after(100, poll)
+                return
+            if 'error' in result:
+                ax.set_title(f"Ошибка: {result['error']}")
+                canvas.draw()
+                return
+            escape, attractor = result['labels']
+            ax.imshow(basin_image(escape, attractor, self.basin_iterations),
+                      extent=(*xlim, *ylim), origin='lower', interpolation='nearest')
+            for k, cycle in enumerate(result['cycles']):
+                ax.plot(cycle[:, 0], cycle[:, 1], 'o', color='white', markeredgecolor='black',
+                        label=f"Цикл {k + 1} (период {len(cycle)})")
+            if result['cycles']:
+                ax.legend(loc='upper right')
+            # Точки циклов вне области не расширяют оси
+            ax.set_xlim(*xlim)
+            ax.set_ylim(*ylim)
+            ax.set_title(f"Бассейны притяжения (A = {A:.2f}, B = {B:.2f})")
+            canvas.draw()
+
+        worker = threading.Thread(target=compute, daemon=True)
+        worker.start()
+        poll()
 
     def start_animation(self):
         """Запуск анимации"""
@@ -136,6 +237,19 @@ class IkedaAppRealParams:
         self.generate_points()
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = IkedaAppRealParams(root)
-    root.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Система Икеды")
+    group = add_map_arguments(parser, frames=50)
+    group.add_argument('--A', type=float, default=1.0, help="параметр A")
+    group.add_argument('--B', type=float, default=0.9, help="параметр B")
+    group.add_argument('--grid-size', type=int, default=20, help="точек на сторону сетки")
+    args = parser.parse_args()
+    
+    if args.export:
+        scene = MapScene(ikeda, (args.A, args.B), (-5, 5, -5, 5), color='blue',
+                         density=args.density, scale=args.scale,
+                         steps_per_frame=args.steps_per_frame)
+        export_from_args(args, scene, grid_cloud((-2, 2), (-2, 2), args.grid_size, args.dtype))
+    else:
+        root = tk.Tk()
+        app = IkedaAppRealParams(root)
+        root.mainloop()
\ No newline at end of file
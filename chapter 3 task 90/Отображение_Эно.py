@@ -1,9 +1,23 @@
+import argparse
+import sys
+import tempfile
+import threading
+from pathlib import Path
 import numpy as np
 import tkinter as tk
 from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.basins import basin_image, escape_basins, periodic_attractors
+from dynamics.export import MapScene, add_map_arguments, export_from_args
+from dynamics.maps import grid_cloud, henon, workspace
+from dynamics.jit import henon_orbit
+from dynamics.orbit import henon_orbit_diagram, long_orbit, plot_orbit_density
+from dynamics.raster import SCALES, DensityRaster
+from dynamics.worker import MapWorker
+
 class HenonApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -14,7 +28,25 @@ class HenonApp(tk.Tk):
         self.λ = 1.4
         self.b = 0.3
         self.running = False
+        self.worker = None
+        self.frame_interval = 30  # мс между кадрами отрисовки
+        self.steps_per_frame = tk.IntVar(value=1)
+        self.cloud_size = tk.IntVar(value=50)
+        self.density_mode = tk.BooleanVar(value=False)
+        self.density_scale = tk.StringVar(value='log')
+        
+        # Орбитальная диаграмма по λ: диапазон, число значений и каталог кеша
+        self.orbit_range = (0.1, 2.0)
+        self.orbit_resolution = 10000
+        self.orbit_cache = Path(tempfile.gettempdir()) / "henon_orbit_cache"
+        # Время убегания и бассейны циклов: область, сетка и число итераций
+        self.basin_range = ((-2.5, 2.5), (-2.5, 2.5))
+        self.basin_resolution = 1024
+        self.basin_iterations = 200
+        # Число точек одной орбиты в окне аттрактора
+        self.attractor_points = 10**6
         self.points = self.generate_cloud()
+        self.work = None
         
         # Создание элементов интерфейса
         self.create_widgets()
@@ -31,6 +63,13 @@ class HenonApp(tk.Tk):
         self.b_slider, self.b_label = self.create_slider_with_label(
             control_frame, "b:", 0.0, 1.2, self.b)
         
+        # Число итераций между кадрами и размер облака (cloud_size^2 точек)
+        self.create_spinbox(control_frame, "Итераций за кадр:", self.steps_per_frame, 1, 1000)
+        self.create_spinbox(control_frame, "Сетка облака:", self.cloud_size, 2, 2000)
+        
+        # Режим плотности: облако рисуется как изображение гистограммы
+        self.create_density_controls(control_frame)
+        
         # Кнопки управления
         self.btn_frame = ttk.Frame(control_frame)
         self.btn_frame.pack(pady=20)
@@ -40,6 +79,13 @@ class HenonApp(tk.Tk):
         
         self.reset_btn = ttk.Button(self.btn_frame, text="Сброс", command=self.reset)
         self.reset_btn.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(control_frame, text="Орбитальная диаграмма",
+                   command=self.show_orbit_diagram).pack(fill=tk.X)
+        ttk.Button(control_frame, text="Бассейны",
+                   command=self.show_basins).pack(fill=tk.X, pady=5)
+        ttk.Button(control_frame, text="Аттрактор",
+                   command=self.show_attractor).pack(fill=tk.X)
 
     def create_slider_with_label(self, parent, label, min_val, max_val, init_val):
         frame = ttk.Frame(parent)
@@ -62,6 +108,29 @@ class HenonApp(tk.Tk):
         
         return slider, value_label
 
+    def create_spinbox(self, parent, label, variable, min_val, max_val):
+        frame = ttk.Frame(parent)
+        frame.pack(fill=tk.X, pady=5)
+        ttk.Label(frame, text=label).pack(side=tk.LEFT)
+        ttk.Spinbox(frame, from_=min_val, to=max_val, textvariable=variable,
+                    width=6).pack(side=tk.RIGHT)
+
+    def create_density_controls(self, parent):
+        frame = ttk.Frame(parent)
+        frame.pack(fill=tk.X, pady=5)
+        ttk.Checkbutton(frame, text="Плотность", variable=self.density_mode,
+                        command=self.show_points).pack(side=tk.LEFT)
+        scale_box = ttk.Combobox(frame, values=SCALES, textvariable=self.density_scale,
+                                 state='readonly', width=9)
+        scale_box.pack(side=tk.RIGHT)
+        scale_box.bind("<<ComboboxSelected>>", lambda e: self.show_points())
+
+    def get_int(self, variable, default):
+        try:
+            return max(1, variable.get())
+        except tk.TclError:
+            return default
+
     def setup_plot(self):
         # Настройка графика
         self.fig = Figure(figsize=(8, 8))
@@ -69,25 +138,23 @@ class HenonApp(tk.Tk):
         self.ax.set_xlim(-10, 10)
         self.ax.set_ylim(-10, 10)
         self.ax.set_title("Эволюция облака точек в отображении Эно")
-        self.scat = self.ax.scatter(self.points[:,0], self.points[:,1], s=1, c='blue')
+        self.scat = self.ax.scatter(*self.points, s=1, c='blue')
+        self.raster = DensityRaster((-10, 10, -10, 10))
+        self.raster.attach(self.ax).set_visible(False)
         
         # Встраивание графика в Tkinter
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-    def generate_cloud(self, num=50):
+    def generate_cloud(self, num=None):
         # Создание регулярной сетки точек
-        x = np.linspace(-0.5, 0.5, num)
-        y = np.linspace(-0.5, 0.5, num)
-        X, Y = np.meshgrid(x, y)
-        return np.column_stack((X.ravel(), Y.ravel()))
+        if num is None:
+            num = self.get_int(self.cloud_size, 50)
+        return grid_cloud((-0.5, 0.5), (-0.5, 0.5), num)
 
     def henon_map(self, points):
-        x, y = points[:, 0], points[:, 1]
-        new_x = 1 - self.λ * x**2 - self.b * y
-        new_y = x
-        print(self.λ, self.b)
-        return np.column_stack((new_x, new_y))
+        # Итерация на месте в буфере потока MapWorker
+        return henon(points, self.λ, self.b, work=self.work)
 
     def update_params(self):
         self.λ = float(self.λ_slider.get())
@@ -97,22 +164,212 @@ class HenonApp(tk.Tk):
         self.update_params()
         self.running = not self.running
         self.start_btn.config(text="Стоп" if self.running else "Старт")
-        self.animate()
+        if self.running:
+            # Итерации выполняются в фоновом потоке, окно только рисует кадры
+            self.work = workspace(henon, self.points)
+            self.worker = MapWorker(self.henon_map, self.points,
+                                    self.get_int(self.steps_per_frame, 1), in_place=True).start()
+            self.animate()
+        else:
+            self.stop_worker()
+
+    def stop_worker(self):
+        if self.worker is not None:
+            self.points = self.worker.stop()
+            self.worker = None
 
     def animate(self):
         if self.running:
-            self.points = self.henon_map(self.points)
-            self.scat.set_offsets(self.points)
-            self.canvas.draw_idle()
-            self.after(250, self.animate)
+            self.worker.steps_per_frame = self.get_int(self.steps_per_frame, 1)
+            points = self.worker.latest()
+            if points is not None:
+                self.points = points
+                self.show_points()
+            self.after(self.frame_interval, self.animate)
 
     def reset(self):
         self.running = False
+        self.stop_worker()
         self.start_btn.config(text="Старт")
         self.points = self.generate_cloud()
-        self.scat.set_offsets(self.points)
+        self.show_points()
+
+    def show_points(self):
+        # Отрисовка облака точками или изображением плотности
+        density = self.density_mode.get()
+        self.scat.set_visible(not density)
+        self.raster.image.set_visible(density)
+        if density:
+            self.raster.scale = self.density_scale.get()
+            self.raster.update(*self.points)
+        else:
+            self.scat.set_offsets(self.points.T)
         self.canvas.draw_idle()
 
+    def show_orbit_diagram(self):
+        # Диаграмма для текущего b в отдельном окне; расчет идет в фоновом потоке
+        self.update_params()
+        b = self.b
+        window = tk.Toplevel(self)
+        window.title(f"Орбитальная диаграмма отображения Эно (b = {b:.2f})")
+        fig = Figure(figsize=(9, 6))
+        ax = fig.add_subplot(111)
+        ax.set_xlabel("λ")
+        ax.set_ylabel("x")
+        ax.set_title("Расчет...")
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+        lambdas = np.linspace(*self.orbit_range, self.orbit_resolution)
+        result = {}
+
+        def compute():
+            try:
+                result['orbits'] = henon_orbit_diagram(lambdas, b, cache_dir=self.orbit_cache)
+            except Exception as error:
+                result['error'] = error
+
+        def poll():
+            if worker.is_alive():
+                window.after(100, poll)
+                return
+            if 'error' in result:
+                ax.set_title(f"Ошибка: {result['error']}")
+                canvas.draw()
+                return
+            self.plot_orbit_diagram(ax, lambdas, result['orbits'])
+            ax.set_title(f"Орбитальная диаграмма (b = {b:.2f})")
+            canvas.draw()
+
+        worker = threading.Thread(target=compute, daemon=True)
+        worker.start()
+        poll()
+
+    def show_attractor(self):
+        # Одна длинная орбита (numba, если доступен) как изображение плотности
+        self.update_params()
+        lam, b = self.λ, self.b
+        window = tk.Toplevel(self)
+        window.title(f"Аттрактор Эно (λ = {lam:.2f}, b = {b:.2f})")
+        fig = Figure(figsize=(8, 8))
+        ax = fig.add_subplot(111)
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+        ax.set_title("Расчет...")
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+        result = {}
+
+        def compute():
+            try:
+                result['points'] = long_orbit(henon_orbit, (0.1, 0.1), (lam, b),
+                                              n_points=self.attractor_points)
+            except Exception as error:
+                result['error'] = error
+
+        def poll():
+            if worker.is_alive():
+                window.after(100, poll)
+                return
+            if 'error' in result:
+                ax.set_title(f"Ошибка: {result['error']}")
+            elif plot_orbit_density(ax, result['points']):
+                ax.set_title(f"Аттрактор Эно (λ = {lam:.2f}, b = {b:.2f}), "
+                             f"{len(result['points'])} точек")
+            else:
+                ax.set_title("Орбита ушла на бесконечность")
+            canvas.draw()
+
+        worker = threading.Thread(target=compute, daemon=True)
+        worker.start()
+        poll()
+
+    def plot_orbit_diagram(self, ax, lambdas, orbits, rows=1000):
+        # Плотность точек (λ, x), накапливаемая по блокам строк без копии всей диаграммы
+        raster = DensityRaster((lambdas[0], lambdas[-1], -1.5, 1.5), bins=(700, 500))
+        counts = 0
+        for start in range(0, len(lambdas), rows):
+            block = orbits[start:start + rows]
+            lam = np.repeat(lambdas[start:start + rows], block.shape[1])
+            counts = counts + raster.histogram(lam, block.ravel())
+        raster.attach(ax).set_data(raster.normalize(counts))
+
+    def show_basins(self):
+        # Время убегания и бассейны притягивающих циклов для текущих λ и b
+        self.update_params()
+        lam, b = self.λ, self.b
+        xlim, ylim = self.basin_range
+        window = tk.Toplevel(self)
+        window.title(f"Бассейны отображения Эно (λ = {lam:.2f}, b = {b:.2f})")
+        fig = Figure(figsize=(8, 8))
+        ax = fig.add_subplot(111)
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+        ax.set_title("Поиск циклов...")
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+        result = {'done': 0, 'total': 0}
+
+        def report(done, total):
+            result['done'], result['total'] = done, total
+
+        def compute():
+            try:
+                cycles = periodic_attractors(henon, (lam, b), xlim, ylim)
+                result['cycles'] = cycles
+                result['labels'] = escape_basins(
+                    henon, (lam, b), xlim, ylim, (self.basin_resolution, self.basin_resolution),
+                    max_iter=self.basin_iterations, attractors=cycles, progress=report)
+            except Exception as error:
+                result['error'] = error
+
+        def poll():
+            if worker.is_alive():
+                if result['total']:
+                    ax.set_title(f"Расчет: {result['done']}/{result['total']} плиток")
+                    canvas.draw_idle()
+                window.after(100, poll)
+                return
+            if 'error' in result:
+                ax.set_title(f"Ошибка: {result['error']}")
+                canvas.draw()
+                return
+            escape, attractor = result['labels']
+            ax.imshow(basin_image(escape, attractor, self.basin_iterations),
+                      extent=(*xlim, *ylim), origin='lower', interpolation='nearest')
+            for k, cycle in enumerate(result['cycles']):
+                ax.plot(cycle[:, 0], cycle[:, 1], 'o', color='white', markeredgecolor='black',
+                        label=f"Цикл {k + 1} (период {len(cycle)})")
+            if result['cycles']:
+                ax.legend(loc='upper right')
+            # Точки циклов вне области не расширяют оси
+            ax.set_xlim(*xlim)
+            ax.set_ylim(*ylim)
+            ax.set_title(f"Время убегания и бассейны (λ = {lam:.2f}, b = {b:.2f})")
+            canvas.draw()
+
+        worker = threading.Thread(target=compute, daemon=True)
+        worker.start()
+        poll()
+
 if __name__ == "__main__":
-    app = HenonApp()
-    app.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Отображение Эно")
+    group = add_map_arguments(parser)
+    group.add_argument('--lam', type=float, default=1.4, help="параметр λ")
+    group.add_argument('--b', type=float, default=0.3, help="параметр b")
+    group.add_argument('--cloud-size', type=int, default=50, help="точек на сторону сетки")
+    args = parser.parse_args()
+    
+    if args.export:
+        scene = MapScene(henon, (args.lam, args.b), (-10, 10, -10, 10),
+                         title="Эволюция облака точек в отображении Эно",
+                         density=args.density, scale=args.scale,
+                         steps_per_frame=args.steps_per_frame)
+        export_from_args(args, scene, grid_cloud((-0.5, 0.5), (-0.5, 0.5), args.cloud_size,
+                                                 args.dtype))
+    else:
+        app = HenonApp()
+        app.mainloop()
\ No newline at end of file
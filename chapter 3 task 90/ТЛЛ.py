@@ -1,9 +1,18 @@
+import argparse
+import sys
+from pathlib import Path
 import tkinter as tk
 from tkinter import ttk
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.blit import BlitManager
+from dynamics.export import MapScene, add_map_arguments, export_from_args
+from dynamics.maps import compact, grid_cloud, mirror, workspace
+from dynamics.raster import SCALES, DensityRaster
+
 class MirrorMapApp:
     def __init__(self, master):
         self.master = master
@@ -25,6 +34,12 @@ class MirrorMapApp:
         self.points = None
         self.current_iter = 0
         self.anim_running = False
+        # Разошедшиеся точки (inf/NaN) выбрасываются раз в compact_every итераций
+        self.compact_every = 10
+        self.diverged = 0
+        self.density_mode = tk.BooleanVar(value=False)
+        self.density_scale = tk.StringVar(value='log')
+        self.raster = DensityRaster((0, 2*np.pi, 0, 2*np.pi))
         
         # Строковые переменные для отображения значений
         self.z_value = tk.StringVar()
@@ -46,6 +61,14 @@ class MirrorMapApp:
         ttk.Label(control_frame, text="Итерации:").pack()
         ttk.Entry(control_frame, textvariable=self.iterations).pack()
 
+        # Режим плотности: облако рисуется как изображение гистограммы
+        ttk.Checkbutton(control_frame, text="Плотность", variable=self.density_mode,
+                        command=self.update_plot).pack(pady=(5, 0))
+        scale_box = ttk.Combobox(control_frame, values=SCALES, textvariable=self.density_scale,
+                                 state='readonly', width=9)
+        scale_box.pack()
+        scale_box.bind("<<ComboboxSelected>>", lambda e: self.update_plot())
+
         # Управление
         ttk.Button(control_frame, text="Обновить", command=self.generate_points).pack(pady=5)
         ttk.Button(control_frame, text="Старт", command=self.start_animation).pack(pady=5)
@@ -60,6 +83,12 @@ class MirrorMapApp:
         self.ax.set_xlabel("x")
         self.ax.set_ylabel("y")
 
+        # Постоянные элементы графика: на кадре меняются только их данные
+        self.scat = self.ax.scatter([], [], s=1, c='red')
+        self.raster.attach(self.ax).set_visible(False)
+        self.title = self.ax.set_title('')
+        self.blit = BlitManager(self.canvas, (self.raster.image, self.scat, self.title))
+
     def create_slider(self, parent, label, variable, from_, to_, value_var):
         """Создает слайдер с меткой и отображением значения"""
         frame = ttk.Frame(parent)
@@ -80,42 +109,38 @@ class MirrorMapApp:
     def generate_points(self):
         """Генерация начальных точек"""
         size = self.grid_size.get()
-        x = np.linspace(
-            self.center_x.get() - self.width.get()/2,
-            self.center_x.get() + self.width.get()/2,
-            size
-        )
-        y = np.linspace(
-            self.center_y.get() - self.height.get()/2,
-            self.center_y.get() + self.height.get()/2,
-            size
-        )
-        X, Y = np.meshgrid(x, y)
-        self.points = np.column_stack((X.flatten(), Y.flatten()))
+        xlim = (self.center_x.get() - self.width.get()/2, self.center_x.get() + self.width.get()/2)
+        ylim = (self.center_y.get() - self.height.get()/2, self.center_y.get() + self.height.get()/2)
+        self.points = grid_cloud(xlim, ylim, size)
+        self.work = workspace(mirror, self.points)
         self.current_iter = 0
+        self.diverged = 0
         self.update_plot()
 
     def iterate_system(self):
         """Итерация системы"""
-        z = self.z.get()
-        h = self.h.get()
-        
-        # Обновление y
-        y_new = (self.points[:,1] - z * np.sin(self.points[:,0])) % (2*np.pi)
-        # Обновление x
-        x_new = (self.points[:,0] + h * np.tan(y_new)) % (2*np.pi)
-        
-        self.points = np.column_stack((x_new, y_new))
+        with np.errstate(over='ignore', invalid='ignore'):
+            mirror(self.points, self.z.get(), self.h.get(), work=self.work[:, :self.points.shape[1]])
         self.current_iter += 1
+        if self.current_iter % self.compact_every == 0:
+            self.points, dropped = compact(self.points)
+            self.diverged += dropped
 
     def update_plot(self):
         """Отрисовка точек"""
-        self.ax.clear()
-        self.ax.scatter(self.points[:,0], self.points[:,1], s=1, c='red')
-        self.ax.set_title(f'Итерация: {self.current_iter}')
-        self.ax.set_xlim(0, 2*np.pi)
-        self.ax.set_ylim(0, 2*np.pi)
-        self.canvas.draw()
+        density = self.density_mode.get()
+        self.scat.set_visible(not density)
+        self.raster.image.set_visible(density)
+        if density:
+            self.raster.scale = self.density_scale.get()
+            self.raster.update(*self.points)
+        else:
+            self.scat.set_offsets(self.points.T)
+        title = f'Итерация: {self.current_iter}'
+        if self.diverged:
+            title += f', разошлось точек: {self.diverged}'
+        self.title.set_text(title)
+        self.blit.update()
 
     def start_animation(self):
         if not self.anim_running:
@@ -132,6 +157,20 @@ class MirrorMapApp:
             self.master.after(50, self.animate)
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = MirrorMapApp(root)
-    root.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Гофрированное зеркало")
+    group = add_map_arguments(parser, frames=50)
+    group.add_argument('--z', type=float, default=1.0, help="параметр z")
+    group.add_argument('--h', type=float, default=0.5, help="параметр h")
+    group.add_argument('--grid-size', type=int, default=20, help="точек на сторону сетки")
+    args = parser.parse_args()
+    
+    if args.export:
+        scene = MapScene(mirror, (args.z, args.h), (0, 2*np.pi, 0, 2*np.pi), color='red',
+                         density=args.density, scale=args.scale,
+                         steps_per_frame=args.steps_per_frame, xlabel="x", ylabel="y")
+        export_from_args(args, scene, grid_cloud((0, 2*np.pi), (0, 2*np.pi), args.grid_size,
+                                                 args.dtype))
+    else:
+        root = tk.Tk()
+        app = MirrorMapApp(root)
+        root.mainloop()
\ No newline at end of file
@@ -1,9 +1,17 @@
+import sys
+from pathlib import Path
 import numpy as np
 import tkinter as tk
 from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.equilibria import classify, equilibria_at, stability_color, trace_branches
+from dynamics.streamcache import StreamlineCache, draw_streamlines
+from dynamics.systems import (pitchfork_derivs, pitchfork_jacobian,
+                              saddle_node_derivs, saddle_node_jacobian)
+
 class BifurcationApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -15,10 +23,31 @@ class BifurcationApp(tk.Tk):
         self.mu = 0.0
         self.y_sign = -1
         
+        # Линии тока берутся из кеша, который заранее заполняется в фоне на сетке μ
+        self.mu_grid = np.linspace(-1.0, 1.0, 81)
+        self.saddle_streams = StreamlineCache(saddle_node_derivs, (-3, 3), (-1.5, 1.5),
+                                              args=(self.y_sign,))
+        self.pitchfork_streams = StreamlineCache(pitchfork_derivs, (-2, 2), (-1, 1))
+        self.refine_pending = False
+        
+        # Ветви равновесий прослеживаются один раз на всем диапазоне слайдера,
+        # при смене μ точки берутся с ветвей, а не ищутся заново
+        seeds = np.stack(np.meshgrid(np.linspace(-3, 3, 13), np.linspace(-1.5, 1.5, 7)),
+                         axis=-1).reshape(-1, 2)
+        self.saddle_branches = trace_branches(saddle_node_derivs, saddle_node_jacobian, seeds,
+                                              (-1.0, 1.0), args=(self.y_sign,))
+        self.pitchfork_branches = trace_branches(pitchfork_derivs, pitchfork_jacobian, seeds,
+                                                 (-1.0, 1.0))
+        
         # Создание виджетов
         self.create_widgets()
         self.init_plots()
         
+        # Сначала считаются значения, ближайшие к текущему μ
+        order = np.argsort(np.abs(self.mu_grid - self.mu))
+        self.saddle_streams.precompute(self.mu_grid[order])
+        self.pitchfork_streams.precompute(self.mu_grid[order])
+        
     def create_widgets(self):
         # Фрейм для графиков
         self.plot_frame = ttk.Frame(self)
@@ -63,54 +92,72 @@ class BifurcationApp(tk.Tk):
     
     def update_saddle_node(self):
         self.ax1.clear()
-        x = np.linspace(-3, 3, 30)
-        y = np.linspace(-1.5, 1.5, 20)
-        X, Y = np.meshgrid(x, y)
+        self.draw_cached_streamlines(self.ax1, self.saddle_streams)
         
-        DX = self.mu + X**2
-        DY = self.y_sign * Y
-        
-        self.ax1.streamplot(X, Y, DX, DY, color='gray', density=1.5)
-        
-        if self.mu < 0:
-            self.ax1.plot(-np.sqrt(-self.mu), 0, 'go', markersize=10, label='Устойчивый узел')
-            self.ax1.plot(np.sqrt(-self.mu), 0, 'ro', markersize=10, label='Седло')
-        elif self.mu == 0:
-            self.ax1.plot(0, 0, 'o', color='orange', markersize=10, label='Седло-узел')
+        found = self.plot_equilibria(self.ax1, self.saddle_branches, saddle_node_derivs,
+                                     saddle_node_jacobian, (self.y_sign,))
         
         self.ax1.set_title(f"Седло-узел ($\mu = {self.mu:.2f}$)")
         self.ax1.set_xlim(-3, 3)
         self.ax1.set_ylim(-1.5, 1.5)
-        self.ax1.legend()
+        if found:
+            self.ax1.legend()
     
     def update_pitchfork(self):
         self.ax2.clear()
-        x = np.linspace(-2, 2, 30)
-        y = np.linspace(-1, 1, 20)
-        X, Y = np.meshgrid(x, y)
-        
-        DX = self.mu*X - X**3
-        DY = -Y
+        self.draw_cached_streamlines(self.ax2, self.pitchfork_streams)
         
-        self.ax2.streamplot(X, Y, DX, DY, color='gray', density=1.5)
-        
-        if self.mu <= 0:
-            self.ax2.plot(0, 0, 'go', markersize=10, label='Устойчивый узел')
-        else:
-            self.ax2.plot(0, 0, 'ro', markersize=10, label='Седло')
-            self.ax2.plot(np.sqrt(self.mu), 0, 'go', markersize=10)
-            self.ax2.plot(-np.sqrt(self.mu), 0, 'go', markersize=10)
+        found = self.plot_equilibria(self.ax2, self.pitchfork_branches, pitchfork_derivs,
+                                     pitchfork_jacobian)
         
         self.ax2.set_title(f"Вилка ($\mu = {self.mu:.2f}$)")
         self.ax2.set_xlim(-2, 2)
         self.ax2.set_ylim(-1, 1)
-        self.ax2.legend()
+        if found:
+            self.ax2.legend()
+    
+    def plot_equilibria(self, ax, branches, rhs, jac, args=()):
+        # Равновесия при текущем μ с типом по собственным значениям матрицы Якоби
+        points = equilibria_at(branches, self.mu, rhs, jac, args)
+        kinds, _ = classify(jac(points, self.mu, *args))
+        labeled = set()
+        for (x, y), kind in zip(points, kinds):
+            label = None if kind in labeled else kind.capitalize()
+            labeled.add(kind)
+            ax.plot(x, y, 'o', color=stability_color(kind), markersize=10, label=label)
+        return len(points)
+    
+    def draw_cached_streamlines(self, ax, cache):
+        # Если точного μ еще нет в кеше, показываются линии тока ближайшего
+        # готового значения, а точные досчитываются в фоне
+        geometry = cache.get(self.mu)
+        if geometry is None:
+            nearest = cache.nearest(self.mu)
+            if nearest is None:
+                geometry = cache.compute(self.mu)
+            else:
+                geometry = nearest[1]
+                cache.request(self.mu)
+                self.refine_pending = True
+        draw_streamlines(ax, geometry, color='gray')
     
     def update_plots(self, event=None):
+        self.refine_pending = False
         self.update_saddle_node()
         self.update_pitchfork()
         self.fig.tight_layout()
         self.canvas.draw()
+        if self.refine_pending:
+            self.after(50, self.refine_plots, self.mu)
+    
+    def refine_plots(self, mu):
+        # Слайдер уже сдвинут - перерисовка будет при следующем отпускании
+        if mu != self.mu:
+            return
+        if self.saddle_streams.get(mu) is None or self.pitchfork_streams.get(mu) is None:
+            self.after(50, self.refine_plots, mu)
+            return
+        self.update_plots()
 
 if __name__ == "__main__":
     app = BifurcationApp()
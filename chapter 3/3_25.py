@@ -1,10 +1,24 @@
+import sys
+from pathlib import Path
 import tkinter as tk
 from tkinter import ttk
 import numpy as np
+from scipy import sparse
 from scipy.integrate import solve_ivp
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.hopf import hopf_trajectory
+from dynamics.systems import hopf_jacobian
+
+def block_index(n):
+    """Строки и столбцы элементов блоков 3x3 траекторий в векторе [x_1..x_n, y_1..y_n, z_1..z_n]"""
+    i = np.arange(n)
+    a, b = np.divmod(np.arange(9), 3)
+    return (a[:, None]*n + i).ravel(), (b[:, None]*n + i).ravel()
 
 class HopfBifurcationApp:
     def __init__(self, master):
@@ -16,6 +30,16 @@ class HopfBifurcationApp:
         self.omega = 1.0
         self.lambda_z = 1.0
 
+        # Облако траекторий вокруг предельного цикла
+        self.show_cloud = tk.BooleanVar(value=False)
+        self.cloud_size = tk.IntVar(value=200)
+        self.cloud_points = 300
+
+        # Метод solve_ivp; None - точное решение нормальной формы (для
+        # подклассов с другой hopf_system - RK45). Неявным методам (Radau, BDF)
+        # передается матрица Якоби или ее разреженная структура
+        self.ivp_method = None
+
         # Настройка GUI
         self.setup_gui()
 
@@ -41,13 +65,88 @@ class HopfBifurcationApp:
         self.label = ttk.Label(self.master, text="μ = 0.00")
         self.label.pack(side=tk.BOTTOM)
 
+        # Управление облаком траекторий
+        cloud_frame = ttk.Frame(self.master)
+        cloud_frame.pack(side=tk.BOTTOM)
+        ttk.Checkbutton(cloud_frame, text="Облако траекторий", variable=self.show_cloud,
+                        command=self.update).pack(side=tk.LEFT)
+        ttk.Spinbox(cloud_frame, from_=10, to=2000, increment=10, width=6,
+                    textvariable=self.cloud_size, command=self.update).pack(side=tk.LEFT)
+        ttk.Label(cloud_frame, text="Метод:").pack(side=tk.LEFT, padx=(10, 0))
+        self.method_box = ttk.Combobox(cloud_frame, values=('точное', 'RK45', 'Radau', 'BDF'),
+                                       state='readonly', width=8)
+        self.method_box.set('точное')
+        self.method_box.bind('<<ComboboxSelected>>', self.select_method)
+        self.method_box.pack(side=tk.LEFT)
+
     def hopf_system(self, t, state):
-        x, y, z = state
+        # Состояние - сцепленные векторы [x_1..x_N, y_1..y_N, z_1..z_N]
+        # (допускается дополнительная ось при vectorized=True)
+        state = np.asarray(state)
+        x, y, z = state.reshape((3, -1) + state.shape[1:])
         r_squared = x**2 + y**2
         dxdt = (self.mu - r_squared)*x - self.omega*y
         dydt = self.omega*x + (self.mu - r_squared)*y
         dzdt = -self.lambda_z*z
-        return [dxdt, dydt, dzdt]
+        return np.concatenate((dxdt, dydt, dzdt))
+
+    def hopf_jacobian(self, t, state):
+        """Матрица Якоби hopf_system: разреженная, по блоку 3x3 на траекторию"""
+        state = np.asarray(state)
+        n = len(state) // 3
+        blocks = hopf_jacobian(state.reshape(3, n).T, self.mu, self.omega, self.lambda_z)
+        return sparse.csr_matrix((blocks.transpose(1, 2, 0).ravel(), block_index(n)),
+                                 shape=(3*n, 3*n))
+
+    def select_method(self, event=None):
+        choice = self.method_box.get()
+        self.ivp_method = None if choice == 'точное' else choice
+        self.update()
+
+    def defining_class(self, name):
+        """Класс, в котором определен метод name (ближайший по MRO)"""
+        return next(cls for cls in type(self).__mro__ if name in vars(cls))
+
+    def jacobian_options(self, n):
+        """
+        Аргументы solve_ivp для неявного метода: точная матрица Якоби, если
+        hopf_jacobian определен в том же классе, что и hopf_system, или ниже
+        по иерархии; иначе (подкласс изменил только систему) - структура из
+        блоков 3x3, и разностная матрица Якоби считается по 9 столбцам вместо 3n
+        """
+        if self.ivp_method not in ('Radau', 'BDF'):
+            return {}
+        if issubclass(self.defining_class('hopf_jacobian'), self.defining_class('hopf_system')):
+            return {'jac': self.hopf_jacobian}
+        return {'jac_sparsity': sparse.csr_matrix((np.ones(9*n), block_index(n)),
+                                                  shape=(3*n, 3*n))}
+
+    def is_normal_form(self):
+        """Точное решение применимо, пока hopf_system - нормальная форма этого класса"""
+        return self.defining_class('hopf_system') is HopfBifurcationApp
+
+    def trajectories(self, initial_conditions, t_eval):
+        """Траектории (x, y, z) для каждого начального условия"""
+        if self.ivp_method is None and self.is_normal_form():
+            return hopf_trajectory(initial_conditions, t_eval,
+                                   self.mu, self.omega, self.lambda_z)
+        # Все начальные условия интегрируются одним вызовом как общий вектор состояния
+        ic = np.atleast_2d(np.asarray(initial_conditions, dtype=float))
+        sol = solve_ivp(self.hopf_system, [t_eval[0], t_eval[-1]], ic.T.ravel(),
+                        method=self.ivp_method or 'RK45', t_eval=t_eval, vectorized=True,
+                        **self.jacobian_options(len(ic)))
+        return sol.y.reshape(3, len(ic), -1).transpose(1, 0, 2)
+
+    def cloud_initial_conditions(self):
+        """Начальные условия облака: кольцо 0 < r < 1.5 и высоты 0 <= z <= 1.5"""
+        try:
+            n = max(1, self.cloud_size.get())
+        except tk.TclError:
+            n = 200
+        rng = np.random.default_rng(0)
+        r = 1.5 * np.sqrt(rng.random(n))
+        phi = 2*np.pi * rng.random(n)
+        return np.column_stack((r*np.cos(phi), r*np.sin(phi), 1.5*rng.random(n)))
 
     def update(self, event=None):
         self.mu = float(self.slider.get())
@@ -62,22 +161,23 @@ class HopfBifurcationApp:
             [0.0, 1.0, 1.0]
         ]
 
-        # Интеграция траекторий
-        for ic in initial_conditions:
-            sol = solve_ivp(
-                self.hopf_system,
-                [0, 20],
-                ic,
-                t_eval=np.linspace(0, 20, 1000)
-            )
+        # Траектории: точное решение нормальной формы или интегрирование
+        for y in self.trajectories(initial_conditions, np.linspace(0, 20, 1000)):
             self.ax.plot(
-                sol.y[0], 
-                sol.y[1], 
-                sol.y[2], 
+                y[0], 
+                y[1], 
+                y[2], 
                 lw=0.8,
                 alpha=0.7
             )
 
+        # Облако: сотни траекторий, рассчитанных одним вызовом и нарисованных одной коллекцией
+        if self.show_cloud.get():
+            cloud = self.trajectories(self.cloud_initial_conditions(),
+                                      np.linspace(0, 20, self.cloud_points))
+            self.ax.add_collection3d(Line3DCollection(
+                cloud.transpose(0, 2, 1), colors='gray', lw=0.4, alpha=0.3))
+
         # Настройка графика
         self.ax.set_xlim(-1.5, 1.5)
         self.ax.set_ylim(-1.5, 1.5)
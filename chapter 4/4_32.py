@@ -1,11 +1,19 @@
+import argparse
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.animation import FuncAnimation
-from scipy.integrate import odeint
+from matplotlib.collections import LineCollection
 import tkinter as tk
 from tkinter import ttk
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.export import add_export_arguments, export_from_args
+from dynamics.stepper import FixedStepper
+from dynamics.systems import double_pendulum_derivs, double_pendulum_jacobian
+
 class DoublePendulumApp:
     def __init__(self, master):
         self.master = master
@@ -15,8 +23,14 @@ class DoublePendulumApp:
         self.pendulum1 = DoublePendulum(color='blue')
         self.pendulum2 = DoublePendulum(color='green')
         
-        self.traj1_x, self.traj1_y = [], []
-        self.traj2_x, self.traj2_y = [], []
+        # Следы маятников в кольцевых буферах
+        self.trail_length = 500
+        self.trail1 = TrailBuffer(self.trail_length)
+        self.trail2 = TrailBuffer(self.trail_length)
+        
+        # Ансамбль маятников с близкими начальными углами
+        self.ensemble = None
+        self.ensemble_trail_length = 100
         self.anim = None
         
         self.create_widgets()
@@ -50,6 +64,18 @@ class DoublePendulumApp:
         self.theta2_slider2, self.theta2_label2 = self.create_slider(
             frame2, 'θ2 (deg):', 0, 180, 90, "{:.0f}")
         
+        # Ансамбль: много маятников с параметрами первого и разбросом углов
+        frame3 = ttk.LabelFrame(control_frame, text="Ансамбль", padding=10)
+        frame3.pack(fill=tk.X, pady=5)
+        self.ensemble_mode = tk.BooleanVar(value=False)
+        self.ensemble_size = tk.IntVar(value=1000)
+        self.ensemble_spread = tk.DoubleVar(value=0.1)
+        ttk.Checkbutton(frame3, text="Режим ансамбля", variable=self.ensemble_mode).pack(anchor=tk.W)
+        ttk.Label(frame3, text="Число маятников:").pack(anchor=tk.W)
+        ttk.Entry(frame3, textvariable=self.ensemble_size).pack(fill=tk.X)
+        ttk.Label(frame3, text="Разброс θ (deg):").pack(anchor=tk.W)
+        ttk.Entry(frame3, textvariable=self.ensemble_spread).pack(fill=tk.X)
+        
         # Кнопка запуска
         self.start_button = ttk.Button(control_frame, text="Запуск", command=self.start_animation)
         self.start_button.pack(pady=10)
@@ -88,6 +114,12 @@ class DoublePendulumApp:
         self.pendulum_line2, = self.ax.plot([], [], 'o-', lw=2, color='green')
         self.trajectory2, = self.ax.plot([], [], '-', lw=1, color='green', alpha=0.3)
         
+        # Элементы для ансамбля: все стержни и все следы - по одной коллекции
+        self.ensemble_arms = LineCollection([], lw=0.5, color='black', alpha=0.3)
+        self.ensemble_trails = LineCollection([], lw=0.5, cmap='viridis', alpha=0.5)
+        self.ax.add_collection(self.ensemble_arms)
+        self.ax.add_collection(self.ensemble_trails)
+        
         self.time_text = self.ax.text(0.02, 0.95, '', transform=self.ax.transAxes)
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
@@ -97,30 +129,35 @@ class DoublePendulumApp:
         if self.anim is not None:
             self.anim.event_source.stop()
         
-        # Обновление параметров для первого маятника
-        self.update_pendulum_params(self.pendulum1, 
-                                  self.L1_label['text'],
-                                  self.L2_label['text'],
-                                  self.theta1_label['text'],
-                                  self.theta2_label['text'])
-        
-        # Обновление параметров для второго маятника
-        self.update_pendulum_params(self.pendulum2,
-                                  self.L1_label2['text'],
-                                  self.L2_label2['text'],
-                                  self.theta1_label2['text'],
-                                  self.theta2_label2['text'])
-        
-        # Сброс траекторий
-        self.traj1_x, self.traj1_y = [], []
-        self.traj2_x, self.traj2_y = [], []
+        if self.ensemble_mode.get():
+            self.setup_ensemble()
+            update, init_func = self.update_ensemble, self.init_ensemble
+        else:
+            # Обновление параметров для первого маятника
+            self.update_pendulum_params(self.pendulum1, 
+                                      self.L1_label['text'],
+                                      self.L2_label['text'],
+                                      self.theta1_label['text'],
+                                      self.theta2_label['text'])
+            
+            # Обновление параметров для второго маятника
+            self.update_pendulum_params(self.pendulum2,
+                                      self.L1_label2['text'],
+                                      self.L2_label2['text'],
+                                      self.theta1_label2['text'],
+                                      self.theta2_label2['text'])
+            
+            # Сброс траекторий
+            self.trail1.clear()
+            self.trail2.clear()
+            update, init_func = self.update, self.init_animation
         
         # Запуск анимации
         self.anim = FuncAnimation(
             self.fig,
-            self.update,
+            update,
             frames=1500,
-            init_func=self.init_animation,
+            init_func=init_func,
             blit=True,
             interval=20,
             repeat=False
@@ -136,50 +173,79 @@ class DoublePendulumApp:
             np.deg2rad(float(theta2)),
             0
         ]
+        pendulum.reset_stepper()
     
-    def init_animation(self):
+    def setup_ensemble(self):
+        """Ансамбль маятников с параметрами первой панели и углами θ1, θ2 + [0, разброс]"""
+        n = max(1, self.ensemble_size.get())
+        offsets = np.linspace(0, np.deg2rad(self.ensemble_spread.get()), n)
+        
+        self.ensemble = DoublePendulum()
+        self.ensemble.L1 = float(self.L1_label['text'])
+        self.ensemble.L2 = float(self.L2_label['text'])
+        self.ensemble.state = np.zeros((n, 4))
+        self.ensemble.state[:, 0] = np.deg2rad(float(self.theta1_label['text'])) + offsets
+        self.ensemble.state[:, 2] = np.deg2rad(float(self.theta2_label['text'])) + offsets
+        self.ensemble.reset_stepper()
+        
+        self.ensemble_trail = TrailBuffer(self.ensemble_trail_length, n)
+        self.ensemble_segments = np.zeros((n, 3, 2))
+        self.ensemble_trails.set_array(np.arange(n))
+        self.ensemble_trails.set_clim(0, n - 1)
+    
+    def clear_artists(self):
         self.pendulum_line1.set_data([], [])
         self.trajectory1.set_data([], [])
         self.pendulum_line2.set_data([], [])
         self.trajectory2.set_data([], [])
+        self.ensemble_arms.set_segments([])
+        self.ensemble_trails.set_segments([])
         self.time_text.set_text('')
+    
+    def init_animation(self):
+        self.clear_artists()
         return (self.pendulum_line1, self.trajectory1,
                 self.pendulum_line2, self.trajectory2,
                 self.time_text)
     
+    def init_ensemble(self):
+        self.clear_artists()
+        return (self.ensemble_arms, self.ensemble_trails, self.time_text)
+    
     def update(self, frame):
         # Обновление первого маятника
-        self.update_pendulum(self.pendulum1, self.traj1_x, self.traj1_y, 'blue')
+        self.update_pendulum(self.pendulum1, self.trail1, self.pendulum_line1, self.trajectory1)
         # Обновление второго маятника
-        self.update_pendulum(self.pendulum2, self.traj2_x, self.traj2_y, 'green')
+        self.update_pendulum(self.pendulum2, self.trail2, self.pendulum_line2, self.trajectory2)
         
         self.time_text.set_text(f'Время: {frame * self.pendulum1.dt:.2f} с')
         return (self.pendulum_line1, self.trajectory1,
                 self.pendulum_line2, self.trajectory2,
                 self.time_text)
     
-    def update_pendulum(self, pendulum, traj_x, traj_y, color):
-        t = np.linspace(0, pendulum.dt, 2)
-        sol = odeint(pendulum.equations, pendulum.state, t)
-        pendulum.state = sol[-1]
-        
-        x1 = pendulum.L1 * np.sin(pendulum.state[0])
-        y1 = -pendulum.L1 * np.cos(pendulum.state[0])
-        x2 = x1 + pendulum.L2 * np.sin(pendulum.state[2])
-        y2 = y1 - pendulum.L2 * np.cos(pendulum.state[2])
-        
-        traj_x.append(x2)
-        traj_y.append(y2)
-        if len(traj_x) > 500:
-            traj_x.pop(0)
-            traj_y.pop(0)
-        
-        if color == 'blue':
-            self.pendulum_line1.set_data([0, x1, x2], [0, y1, y2])
-            self.trajectory1.set_data(traj_x, traj_y)
-        else:
-            self.pendulum_line2.set_data([0, x1, x2], [0, y1, y2])
-            self.trajectory2.set_data(traj_x, traj_y)
+    def update_pendulum(self, pendulum, trail, line, trajectory):
+        # Состояние и координаты уже вычислены интегратором заранее
+        pendulum.state, (x1, y1, x2, y2) = pendulum.stepper.next()
+        
+        trail.push((x2, y2))
+        traj_x, traj_y = trail.ordered()[0].T
+        
+        line.set_data([0, x1, x2], [0, y1, y2])
+        trajectory.set_data(traj_x, traj_y)
+    
+    def update_ensemble(self, frame):
+        # Все маятники ансамбля продвигаются одним вызовом derivs на массиве (N, 4)
+        self.ensemble.state, positions = self.ensemble.stepper.next()
+        
+        self.ensemble_segments[:, 1] = positions[:, :2]
+        self.ensemble_segments[:, 2] = positions[:, 2:]
+        self.ensemble_arms.set_segments(self.ensemble_segments)
+        
+        self.ensemble_trail.push(positions[:, 2:])
+        self.ensemble_trails.set_segments(self.ensemble_trail.ordered())
+        
+        self.time_text.set_text(f'Время: {frame * self.ensemble.dt:.2f} с')
+        return (self.ensemble_arms, self.ensemble_trails, self.time_text)
 
 class DoublePendulum:
     def __init__(self, color='blue'):
@@ -191,24 +257,148 @@ class DoublePendulum:
         self.dt = 0.02
         self.state = np.array([np.pi/2, 0, np.pi/2, 0])
         self.color = color
+        self.lookahead = 50
+        self.reset_stepper()
+    
+    def reset_stepper(self):
+        """Интегратор RK4, продвигающий state на dt и считающий кадры на lookahead вперед"""
+        self.stepper = FixedStepper(self.derivs, self.state, self.dt,
+                                    lookahead=self.lookahead, observe=self.positions)
         
     def equations(self, y, t):
-        theta1, omega1, theta2, omega2 = y
-        delta = theta2 - theta1
-        
-        denom = (self.m1 + self.m2 - self.m2*np.cos(delta)**2)
-        domega1 = ((self.m2 * self.L1 * omega1**2 * np.sin(delta) * np.cos(delta)
-                   + self.m2 * self.g * np.sin(theta2) * np.cos(delta) + 
-                   self.m2 * self.L2 * omega2**2 * np.sin(delta) - (self.m1 + self.m2)*self.g*np.sin(theta1))
-                    / (self.L1 * denom))
-        domega2 = ((-self.m2 * self.L2 * omega2**2 * np.sin(delta) * np.cos(delta)
-                   + (self.m2 + self.m2)*(self.g * np.sin(theta1) * np.cos(delta)
-                    - self.L1 * omega1**2 * np.sin(delta) - self.g*np.sin(theta2)))
-                    / (self.L2 * denom))
+        return self.derivs(np.asarray(y, dtype=float))
+    
+    def derivs(self, y, out=None):
+        return double_pendulum_derivs(y, self.L1, self.L2, self.m1, self.m2, self.g, out=out)
+    
+    def jacobian(self, y, out=None):
+        """Матрица Якоби правой части для массива состояний (..., 4)"""
+        return double_pendulum_jacobian(y, self.L1, self.L2, self.m1, self.m2, self.g, out=out)
+    
+    def positions(self, states):
+        """Координаты грузов (x1, y1, x2, y2) для массива состояний (..., 4)"""
+        x1 = self.L1 * np.sin(states[..., 0])
+        y1 = -self.L1 * np.cos(states[..., 0])
+        x2 = x1 + self.L2 * np.sin(states[..., 2])
+        y2 = y1 - self.L2 * np.cos(states[..., 2])
+        return np.stack((x1, y1, x2, y2), axis=-1)
 
-        return [omega1, domega1, omega2, domega2]
+class TrailBuffer:
+    """
+    Кольцевой буфер последних capacity точек следа для n маятников.
+    Каждая точка пишется дважды (в i и i + capacity), поэтому след
+    в хронологическом порядке - это непрерывный срез без копирования.
+    """
+    def __init__(self, capacity, n=1):
+        self.capacity = capacity
+        self.data = np.empty((2 * capacity, n, 2))
+        self.clear()
+    
+    def clear(self):
+        self.head = 0
+        self.count = 0
+    
+    def push(self, points):
+        self.data[self.head] = points
+        self.data[self.head + self.capacity] = points
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    def ordered(self):
+        """След в хронологическом порядке, форма (n, count, 2)"""
+        end = self.head + self.capacity
+        return self.data[end - self.count:end].transpose(1, 0, 2)
+
+class PendulumScene:
+    """
+    Сцена для экспорта кадров без окна (dynamics.export). Все маятники -
+    один пакет состояний (N, 4) с длинами L1, L2 формы (N,). В режиме
+    ensemble рисуются как ансамбль в окне, иначе каждый своим цветом,
+    как пара маятников.
+    """
+    figsize = (10, 8)
+    
+    def __init__(self, L1, L2, theta1, theta2, ensemble=False, trail_length=500):
+        n = len(L1)
+        self.pendulum = DoublePendulum()
+        self.pendulum.L1 = np.asarray(L1, dtype=float)
+        self.pendulum.L2 = np.asarray(L2, dtype=float)
+        self.pendulum.state = np.zeros((n, 4))
+        self.pendulum.state[:, 0] = np.deg2rad(theta1)
+        self.pendulum.state[:, 2] = np.deg2rad(theta2)
+        self.pendulum.reset_stepper()
+        self.ensemble = ensemble
+        self.trail_length = trail_length
+        self.colors = (['blue', 'green'] + [f'C{i}' for i in range(2, n)])[:n]
+    
+    def initial_state(self):
+        states = self.pendulum.state.copy()
+        trail = TrailBuffer(self.trail_length, len(states))
+        trail.push(self.pendulum.positions(states)[:, 2:])
+        return states, trail
+    
+    def advance(self, state):
+        states, trail = state
+        self.pendulum.stepper.step(states)
+        trail.push(self.pendulum.positions(states)[:, 2:])
+        return state
+    
+    def setup(self, fig):
+        ax = fig.add_subplot(111)
+        ax.set_xlim(-6, 6)
+        ax.set_ylim(-6, 6)
+        ax.grid()
+        n = len(self.pendulum.state)
+        if self.ensemble:
+            self.arms = LineCollection([], lw=0.5, color='black', alpha=0.3)
+            self.trails = LineCollection([], lw=0.5, cmap='viridis', alpha=0.5)
+            self.trails.set_array(np.arange(n))
+            self.trails.set_clim(0, n - 1)
+            ax.add_collection(self.arms)
+            ax.add_collection(self.trails)
+        else:
+            self.arms = [ax.plot([], [], 'o-', lw=2, color=c)[0] for c in self.colors]
+            self.trails = [ax.plot([], [], '-', lw=1, color=c, alpha=0.3)[0] for c in self.colors]
+        self.time_text = ax.text(0.02, 0.95, '', transform=ax.transAxes)
+    
+    def draw(self, state, frame):
+        states, trail = state
+        positions = self.pendulum.positions(states)
+        segments = np.zeros((len(states), 3, 2))
+        segments[:, 1] = positions[:, :2]
+        segments[:, 2] = positions[:, 2:]
+        if self.ensemble:
+            self.arms.set_segments(segments)
+            self.trails.set_segments(trail.ordered())
+        else:
+            for arm, tail, segment, path in zip(self.arms, self.trails, segments, trail.ordered()):
+                arm.set_data(segment[:, 0], segment[:, 1])
+                tail.set_data(path[:, 0], path[:, 1])
+        self.time_text.set_text(f'Время: {frame * self.pendulum.dt:.2f} с')
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = DoublePendulumApp(root)
-    root.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Двойной маятник")
+    group = add_export_arguments(parser, frames=1500)
+    group.add_argument('--pendulum', nargs=4, type=float, action='append',
+                       metavar=('L1', 'L2', 'THETA1', 'THETA2'),
+                       help="маятник: длины (м) и углы (град); по умолчанию два маятника 1 1 90 90")
+    group.add_argument('--ensemble', type=int, default=0, metavar='N',
+                       help="ансамбль из N маятников с параметрами первого")
+    group.add_argument('--spread', type=float, default=0.1, help="разброс θ ансамбля (град)")
+    args = parser.parse_args()
+    
+    if args.export:
+        pendulums = np.array(args.pendulum or [[1.0, 1.0, 90.0, 90.0]] * 2)
+        if args.ensemble:
+            L1, L2, theta1, theta2 = pendulums[0]
+            n = args.ensemble
+            offsets = np.linspace(0, args.spread, n)
+            scene = PendulumScene(np.full(n, L1), np.full(n, L2), theta1 + offsets,
+                                  theta2 + offsets, ensemble=True, trail_length=100)
+        else:
+            scene = PendulumScene(*pendulums.T)
+        export_from_args(args, scene, scene.initial_state())
+    else:
+        root = tk.Tk()
+        app = DoublePendulumApp(root)
+        root.mainloop()
\ No newline at end of file
@@ -1,9 +1,19 @@
+import sys
+import threading
+import time
+from pathlib import Path
 import numpy as np
 import tkinter as tk
 from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from scipy.integrate import odeint
+from mpl_toolkits.mplot3d import proj3d
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.lorenz_maxima import lorenz_maxima_sweep, lorenz_return_map, lorenz_z_maxima
+from dynamics.stream import odeint_chunks
+from dynamics.systems import lorenz_jacobian
 
 class LorenzApp(tk.Tk):
     def __init__(self):
@@ -16,6 +26,21 @@ class LorenzApp(tk.Tk):
         self.t = np.linspace(0, 40, 4000)
         self.initial_state = [1.0, 1.0, 1.0]
         
+        # Число точек в одной ломаной одного цвета: отрисовка стоит пропорционально
+        # числу ломаных, а не точек
+        self.segment_points = 8
+        
+        # Траектория приходит блоками (dynamics.stream): за один проход цикла
+        # событий блоки добавляются не дольше frame_budget секунд, затем
+        # холст перерисовывается; новое значение ρ прерывает старый расчет
+        self.frame_budget = 0.015
+        self.stream = None
+        self.stream_job = None
+        
+        # Диаграмма максимумов z по ρ
+        self.maxima_range = (0.1, 50.0)
+        self.maxima_resolution = 2000
+        
         # Настройка интерфейса
         self.title("Конвективная петля Лоренца")
         self.geometry("800x600")
@@ -46,6 +71,8 @@ class LorenzApp(tk.Tk):
         
         # Кнопка обновления
         ttk.Button(control_frame, text="Обновить", command=self.update_plot).pack(pady=10)
+        ttk.Button(control_frame, text="Максимумы z по ρ",
+                   command=self.show_maxima_diagram).pack(fill=tk.X)
         
         # График
         self.fig = Figure(figsize=(6, 6))
@@ -53,9 +80,25 @@ class LorenzApp(tk.Tk):
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # Инициализация scatter и colorbar
-        self.sc = None
-        self.cbar = None
+        # Оси настраиваются один раз; траектория - одна коллекция отрезков,
+        # у которой при обновлении меняются только вершины и цвета
+        self.ax.set_xlim((-25, 25))
+        self.ax.set_ylim((-35, 35))
+        self.ax.set_zlim((0, 50))
+        self.ax.set_xlabel("X Axis")
+        self.ax.set_ylabel("Y Axis")
+        self.ax.set_zlabel("Z Axis")
+        self.trajectory = None
+        self.filled = 0
+        self.kept = []
+        self.kept_upto = 0
+        self.lines = Line3DCollection([], cmap='plasma', linewidths=1.0)
+        self.ax.add_collection3d(self.lines, autolim=False)
+        self.cbar = self.fig.colorbar(self.lines, ax=self.ax, label='Температура (z)')
+        
+        # После поворота камеры прореживание пересчитывается под новый вид
+        self.canvas.mpl_connect('button_release_event',
+                                lambda event: self.show_trajectory(rescan=True))
         
         # Первоначальное построение
         self.update_plot()
@@ -67,39 +110,150 @@ class LorenzApp(tk.Tk):
         dzdt = x * y - self.beta * z
         return [dxdt, dydt, dzdt]
     
+    def lorenz_jacobian(self, state, t):
+        """Матрица Якоби lorenz_system (Dfun для odeint)"""
+        return lorenz_jacobian(np.asarray(state, dtype=float), self.rho, self.sigma, self.beta)
+    
     def update_rho(self, value):
         self.rho = float(value)
         self.rho_value.config(text=f"ρ = {self.rho:.2f}")
+        self.update_plot()
     
     def update_plot(self):
-        # Решение уравнений
-        solution = odeint(self.lorenz_system, self.initial_state, self.t)
-        x, y, z = solution.T
-        
-        # Очистка предыдущего графика
-        self.ax.clear()
-        
-        # Настройка осей
-        self.ax.set_xlim((-25, 25))
-        self.ax.set_ylim((-35, 35))
-        self.ax.set_zlim((0, 50))
-        self.ax.set_xlabel("X Axis")
-        self.ax.set_ylabel("Y Axis")
-        self.ax.set_zlabel("Z Axis")
-        
-        # Построение графика
-        self.sc = self.ax.scatter(x, y, z, c=z, cmap='plasma', s=2)
-        
-        # Обновление или создание цветовой шкалы
-        if self.cbar:
-            self.cbar.update_normal(self.sc)
-        else:
-            self.cbar = self.fig.colorbar(self.sc, ax=self.ax, label='Температура (z)')
-        
+        # Незаконченный расчет для прежнего ρ больше не нужен
+        self.cancel_stream()
+        self.trajectory = np.empty((len(self.t), 3))
+        self.filled = 0
+        self.kept = []
+        self.kept_upto = 0
+        self.stream = odeint_chunks(self.lorenz_system, self.initial_state, self.t,
+                                    Dfun=self.lorenz_jacobian)
         self.ax.set_title(f'Конвективная петля (ρ = {self.rho:.2f})')
+        self.draw_chunks()
+    
+    def cancel_stream(self):
+        if self.stream_job is not None:
+            self.after_cancel(self.stream_job)
+            self.stream_job = None
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+    
+    def draw_chunks(self):
+        # Блоки решения копятся, пока не истечет бюджет кадра, затем рисуются;
+        # первый блок рисуется сразу
+        deadline = time.perf_counter() + self.frame_budget
+        finished = True
+        for _, states in self.stream:
+            self.trajectory[self.filled:self.filled + len(states)] = states
+            self.filled += len(states)
+            if self.filled == len(states) or time.perf_counter() > deadline:
+                finished = False
+                break
+        self.show_trajectory()
+        if finished:
+            self.stream = None
+            self.stream_job = None
+        else:
+            self.stream_job = self.after(1, self.draw_chunks)
+    
+    def decimate(self, points):
+        # Подряд идущие точки, попадающие на экране в один пиксель, неразличимы -
+        # оставляется первая из них (и последняя точка траектории)
+        x, y, z = points.T
+        xs, ys, _ = proj3d.proj_transform(x, y, z, self.ax.get_proj())
+        pixels = np.rint(self.ax.transData.transform(np.column_stack([xs, ys])))
+        keep = np.empty(len(points), dtype=bool)
+        keep[0] = True
+        np.any(pixels[1:] != pixels[:-1], axis=1, out=keep[1:])
+        keep[-1] = True
+        return points[keep]
+    
+    def show_trajectory(self, rescan=False):
+        if self.filled < 2:
+            return
+        # Прореживаются только новые точки; после поворота камеры - вся траектория
+        if rescan:
+            self.kept = []
+            self.kept_upto = 0
+        start = max(self.kept_upto - 1, 0)
+        new = self.decimate(self.trajectory[start:self.filled])
+        # Первая из новых точек - последняя уже прореженная
+        self.kept.append(new[1:] if self.kept_upto else new)
+        self.kept_upto = self.filled
+        points = np.concatenate(self.kept)
+        # Траектория режется на ломаные по segment_points отрезков с общими концами;
+        # последняя дополняется повтором конечной точки, чтобы все были одной длины
+        k = self.segment_points
+        count = max(1, -(-(len(points) - 1) // k))
+        index = np.arange(count)[:, None] * k + np.arange(k + 1)
+        segments = points[np.minimum(index, len(points) - 1)]
+        self.lines.set_segments(segments)
+        # Цвет ломаной - средняя температура (z) на ней
+        z = segments[:, :, 2].mean(axis=1)
+        self.lines.set_array(z)
+        self.lines.set_clim(z.min(), z.max())
         
         # Обновление холста
-        self.canvas.draw()
+        self.canvas.draw_idle()
+
+    def show_maxima_diagram(self):
+        # Диаграмма ρ - z_max и отображение Лоренца z_n -> z_{n+1} для текущего ρ;
+        # расчет идет в фоновом потоке, процессы пула считают блоки значений ρ
+        rho = self.rho
+        params = dict(sigma=self.sigma, beta=self.beta, initial_state=self.initial_state)
+        window = tk.Toplevel(self)
+        window.title("Максимумы z системы Лоренца")
+        progress_bar = ttk.Progressbar(window, orient=tk.HORIZONTAL, mode='determinate')
+        progress_bar.pack(fill=tk.X, padx=10, pady=5)
+        fig = Figure(figsize=(11, 5))
+        ax_sweep = fig.add_subplot(121)
+        ax_map = fig.add_subplot(122)
+        ax_sweep.set_xlabel("ρ")
+        ax_sweep.set_ylabel("$z_{max}$")
+        ax_sweep.set_title("Расчет...")
+        ax_map.set_xlabel("$z_n$")
+        ax_map.set_ylabel("$z_{n+1}$")
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+        rho_values = np.linspace(*self.maxima_range, self.maxima_resolution)
+        result = {'done': 0, 'total': 1}
+
+        def report(done, total):
+            result['done'], result['total'] = done, total
+
+        def compute():
+            try:
+                result['sweep'] = lorenz_maxima_sweep(rho_values, progress=report, **params)
+                # Для отображения Лоренца нужна одна, но длинная траектория
+                result['map'] = lorenz_return_map(*lorenz_z_maxima(rho, t_record=1000.0, **params))
+            except Exception as error:
+                result['error'] = error
+
+        def poll():
+            progress_bar.config(maximum=result['total'], value=result['done'])
+            if worker.is_alive():
+                window.after(100, poll)
+                return
+            progress_bar.pack_forget()
+            if 'error' in result:
+                ax_sweep.set_title(f"Ошибка: {result['error']}")
+                canvas.draw()
+                return
+            index, zmax = result['sweep']
+            ax_sweep.plot(rho_values[index], zmax, ',', color='k', alpha=0.5)
+            ax_sweep.axvline(rho, color='r', lw=0.8)
+            ax_sweep.set_title(f"Максимумы z (σ = {self.sigma:g}, β = {self.beta:g})")
+            z_n, z_next = result['map']
+            ax_map.plot(z_n, z_next, '.', ms=2, color='tab:blue')
+            ax_map.set_title(f"Отображение Лоренца (ρ = {rho:.2f})")
+            canvas.draw()
+
+        worker = threading.Thread(target=compute, daemon=True)
+        worker.start()
+        poll()
 
 if __name__ == "__main__":
     app = LorenzApp()
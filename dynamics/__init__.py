@@ -0,0 +1,8 @@
+"""Общие вычислительные модули для задач из глав 1, 3 и 4.
+
+Приложения и ноутбуки подключают пакет, добавляя корень репозитория
+в sys.path, например:
+
+    sys.path.insert(0, '..')
+    from dynamics.rk4 import solve_lorenz
+"""
@@ -0,0 +1,180 @@
+"""Бассейны притяжения и время убегания для отображений на плоскости.
+
+Сетка начальных условий (например, 4096 x 4096) режется на квадратные
+плитки, плитки распределяются по пулу процессов. Внутри плитки облако
+итерируется ядром из dynamics.maps на месте, и каждые check_every итераций
+точки, которые убежали за радиус escape_radius или подошли к одному из
+известных притягивающих циклов, получают метку и выбрасываются из
+активного множества: дальше итерируются только еще не определившиеся точки.
+
+Метки - два массива (ny, nx):
+    escape     - номер итерации, на которой точка убежала, или -1;
+    attractor  - номер цикла из attractors, к которому сошлась точка, или -1.
+Точки с -1 в обоих массивах остались ограниченными, но ни к одному циклу
+не подошли (например, лежат в бассейне хаотического аттрактора).
+"""
+import os
+from multiprocessing import Pool
+
+import numpy as np
+from matplotlib import colormaps
+
+from dynamics.maps import grid_cloud, workspace
+
+
+def _orbit_tail(kernel, params, cloud, n_transient, n_record, escape_radius):
+    """Точки после переходного процесса: массив (n_record, 2, N); убежавшие - NaN"""
+    work = workspace(kernel, cloud)
+    with np.errstate(over='ignore', invalid='ignore'):
+        kernel(cloud, *params, steps=n_transient, work=work)
+        tail = np.empty((n_record,) + cloud.shape)
+        for i in range(n_record):
+            kernel(cloud, *params, work=work)
+            tail[i] = cloud
+        tail[:, :, ~(np.hypot(*cloud) < escape_radius)] = np.nan
+    return tail
+
+
+def periodic_attractors(kernel, params, xlim, ylim, num=32, n_transient=2000,
+                        max_period=32, tol=1e-8, escape_radius=1e3):
+    """
+    Притягивающие циклы периода до max_period, найденные из сетки num x num
+    начальных точек. Возвращает список массивов (p, 2) точек каждого цикла.
+    """
+    tail = _orbit_tail(kernel, params, grid_cloud(xlim, ylim, num), n_transient,
+                       max_period + 1, escape_radius)
+    start = tail[0]
+    # Наименьший период, через который точка возвращается в себя
+    shift = tail[1:] - start
+    distance = np.hypot(shift[:, 0], shift[:, 1])
+    returned = distance < tol
+    found = returned.any(axis=0)
+    period = returned.argmax(axis=0) + 1
+
+    cycles = {}
+    for j in np.nonzero(found)[0]:
+        points = tail[:period[j], :, j]
+        # Один цикл из разных начальных точек - по наименьшей (округленной) точке
+        key = min(tuple(np.round(p / np.sqrt(tol))) for p in points)
+        cycles.setdefault(key, points)
+    return [points for points in cycles.values()
+            if _is_attracting(kernel, params, points, n_transient, np.sqrt(tol))]
+
+
+def _is_attracting(kernel, params, points, n_transient, tol, eps=1e-6):
+    """
+    Проверка цикла возмущением: точка сетки может случайно попасть на
+    неустойчивый цикл, но возмущенные точки от него уйдут
+    """
+    angles = np.linspace(0, 2*np.pi, 8, endpoint=False)
+    probes = points[0][:, None] + eps * np.array([np.cos(angles), np.sin(angles)])
+    with np.errstate(over='ignore', invalid='ignore'):
+        kernel(probes, *params, steps=n_transient)
+    distance = np.hypot(probes[0][:, None] - points[:, 0], probes[1][:, None] - points[:, 1])
+    return bool((distance.min(axis=1) < tol).all())
+
+
+def _basin_tile(task):
+    (row, col, xs, ys, kernel, params, max_iter, escape_radius, attractors, labels,
+     tol, check_every, dtype) = task
+    cloud = np.empty((2, len(ys) * len(xs)), dtype=dtype)
+    cloud[0] = np.tile(xs, len(ys))
+    cloud[1] = np.repeat(ys, len(xs))
+    index = np.arange(cloud.shape[1])
+    escape = np.full(cloud.shape[1], -1, dtype=np.int32)
+    attractor = np.full(cloud.shape[1], -1, dtype=np.int16)
+    work = workspace(kernel, cloud)
+    radius2 = escape_radius**2
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        done_iter = 0
+        while done_iter < max_iter and len(index):
+            steps = min(check_every, max_iter - done_iter)
+            kernel(cloud, *params, steps=steps, work=work[:, :cloud.shape[1]])
+            done_iter += steps
+
+            x, y = cloud
+            # NaN и inf тоже считаются убежавшими
+            escaped = ~(x*x + y*y <= radius2)
+            escape[index[escaped]] = done_iter
+            finished = escaped
+            for (px, py), label in zip(attractors, labels):
+                near = np.hypot(x - px, y - py) < tol
+                attractor[index[near]] = label
+                finished |= near
+
+            # Сжатие активного множества: дальше итерируются только живые точки
+            if finished.any():
+                live = ~finished
+                index = index[live]
+                cloud = cloud[:, live]
+    shape = (len(ys), len(xs))
+    return row, col, escape.reshape(shape), attractor.reshape(shape)
+
+
+def escape_basins(kernel, params, xlim, ylim, resolution=(1024, 1024), max_iter=200,
+                  escape_radius=10.0, attractors=(), tol=1e-4, check_every=1, tile=512,
+                  processes=None, dtype=np.float64, progress=None):
+    """
+    Время убегания и бассейны циклов attractors для сетки resolution = (nx, ny)
+    начальных условий на xlim x ylim.
+    - kernel, params: ядро из dynamics.maps и его параметры
+    - attractors: циклы, например из periodic_attractors; точка считается
+      сошедшейся, когда подходит к точке цикла ближе tol
+    - check_every: через сколько итераций проверять и сжимать активное множество
+    - tile: сторона плитки; processes: число процессов (None - все ядра, 1 - без пула)
+    - progress(done, total): вызывается после каждой готовой плитки
+    Возвращает (escape, attractor), массивы (ny, nx).
+    """
+    nx, ny = resolution
+    xs = np.linspace(*xlim, nx)
+    ys = np.linspace(*ylim, ny)
+    if len(attractors):
+        labels = np.concatenate([np.full(len(c), k, dtype=np.int16) for k, c in enumerate(attractors)])
+        points = np.concatenate(attractors)
+    else:
+        labels = np.empty(0, dtype=np.int16)
+        points = np.empty((0, 2))
+
+    tasks = [
+        (row, col, xs[col:col + tile], ys[row:row + tile], kernel, params, max_iter,
+         escape_radius, points, labels, tol, check_every, dtype)
+        for row in range(0, ny, tile) for col in range(0, nx, tile)
+    ]
+    escape = np.empty((ny, nx), dtype=np.int32)
+    attractor = np.empty((ny, nx), dtype=np.int16)
+    done = [0]
+
+    def collect(result):
+        row, col, tile_escape, tile_attractor = result
+        rows, cols = tile_escape.shape
+        escape[row:row + rows, col:col + cols] = tile_escape
+        attractor[row:row + rows, col:col + cols] = tile_attractor
+        done[0] += 1
+        if progress is not None:
+            progress(done[0], len(tasks))
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) == 1:
+        for task in tasks:
+            collect(_basin_tile(task))
+    else:
+        with Pool(processes) as pool:
+            for result in pool.imap_unordered(_basin_tile, tasks):
+                collect(result)
+    return escape, attractor
+
+
+def basin_image(escape, attractor, max_iter, cmap='magma', basin_cmap='tab10'):
+    """
+    RGB-изображение (ny, nx, 3): убежавшие точки - цветом cmap по логарифму
+    времени убегания, бассейны циклов - цветами basin_cmap, остальные - черные.
+    """
+    image = np.zeros(escape.shape + (3,))
+    escaped = escape >= 0
+    shade = np.log1p(escape[escaped]) / np.log1p(max_iter)
+    image[escaped] = colormaps[cmap](shade)[:, :3]
+    basin = attractor >= 0
+    colors = colormaps[basin_cmap]
+    image[basin] = colors(attractor[basin] % colors.N)[:, :3]
+    return image
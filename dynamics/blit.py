@@ -0,0 +1,40 @@
+"""Перерисовка только изменившихся элементов графика (blitting).
+
+Статичная часть фигуры (оси, подписи, сетка) рисуется один раз и
+сохраняется как фон. На каждом кадре фон восстанавливается, поверх
+рисуются только анимированные элементы, и на экран копируется готовое
+изображение - без пересчета разметки осей и полной перерисовки.
+"""
+
+
+class BlitManager:
+    def __init__(self, canvas, artists=()):
+        self.canvas = canvas
+        self.background = None
+        self.artists = []
+        for artist in artists:
+            self.add(artist)
+        # Полная перерисовка (первый показ, изменение размера окна) обновляет фон
+        self.cid = canvas.mpl_connect('draw_event', self.on_draw)
+
+    def add(self, artist):
+        artist.set_animated(True)
+        self.artists.append(artist)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        figure = self.canvas.figure
+        for artist in self.artists:
+            figure.draw_artist(artist)
+
+    def update(self):
+        """Показ нового кадра: фон + анимированные элементы"""
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
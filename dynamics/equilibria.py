@@ -0,0 +1,257 @@
+"""Численный поиск положений равновесия и их продолжение по параметру.
+
+Системы задаются так же, как в dynamics.systems: rhs(state, mu, *args) и
+jac(state, mu, *args), состояние формы (..., d), параметр бифуркации -
+первый после состояния. Равновесия ищутся методом Ньютона сразу из
+множества начальных точек, устойчивость определяется по собственным
+значениям матрицы Якоби. Ветви равновесий прослеживаются по μ
+продолжением по длине дуги (pseudo-arclength), которое проходит и через
+точки поворота (седло-узел); сами точки поворота уточняются и добавляются
+в ветвь. После одного расчета ветвей равновесия при любом μ получаются
+интерполяцией по ветви и парой шагов Ньютона.
+"""
+import numpy as np
+
+STABLE_NODE = 'устойчивый узел'
+STABLE_FOCUS = 'устойчивый фокус'
+UNSTABLE_NODE = 'неустойчивый узел'
+UNSTABLE_FOCUS = 'неустойчивый фокус'
+SADDLE = 'седло'
+SADDLE_FOCUS = 'седло-фокус'
+NONHYPERBOLIC = 'негиперболическая точка'
+
+
+def _solve(matrices, vectors):
+    """Пакетное решение A x = b; при вырожденных матрицах - псевдообратная"""
+    try:
+        return np.linalg.solve(matrices, vectors[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return (np.linalg.pinv(matrices) @ vectors[..., None])[..., 0]
+
+
+def newton(rhs, jac, seeds, mu, args=(), tol=1e-10, max_iter=50):
+    """
+    Метод Ньютона для rhs(x, mu) = 0 сразу из всех начальных точек seeds (N, d).
+    Итерации продолжаются только для еще не сошедшихся точек.
+    Возвращает (points, converged): найденные точки и маску сходимости.
+    """
+    x = np.array(seeds, dtype=float)
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), x.shape[:-1])
+    converged = np.zeros(x.shape[:-1], dtype=bool)
+    active = np.arange(len(x))
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        for _ in range(max_iter):
+            xa = x[active]
+            step = _solve(jac(xa, mu[active], *args), rhs(xa, mu[active], *args))
+            xa -= step
+            x[active] = xa
+            size = np.linalg.norm(step, axis=-1)
+            done = size <= tol * (1 + np.linalg.norm(xa, axis=-1))
+            converged[active[done]] = True
+            active = active[~done & np.isfinite(xa).all(axis=-1)]
+            if len(active) == 0:
+                break
+        # Малый шаг без малой невязки - застревание, а не корень
+        residual = np.linalg.norm(rhs(x, mu, *args), axis=-1)
+        converged &= residual <= np.sqrt(tol)
+    return x, converged
+
+
+def unique_points(points, tol=1e-6):
+    """Удаление совпадающих (с точностью tol) точек, порядок первых вхождений сохраняется"""
+    points = np.asarray(points)
+    if len(points) == 0:
+        return points
+    _, index = np.unique(np.round(points / tol), axis=0, return_index=True)
+    return points[np.sort(index)]
+
+
+def find_equilibria(rhs, jac, seeds, mu, args=(), tol=1e-10):
+    """Все различные равновесия, найденные Ньютоном из seeds, массив (M, d)"""
+    points, converged = newton(rhs, jac, seeds, mu, args, tol)
+    return unique_points(points[converged])
+
+
+def classify(jacobians, tol=1e-7):
+    """
+    Тип равновесия по собственным значениям матриц Якоби (..., d, d).
+    Возвращает (kinds, eigenvalues): список названий и массив (..., d).
+    """
+    eigenvalues = np.linalg.eigvals(jacobians)
+    re, im = eigenvalues.real, eigenvalues.imag
+    n_pos = (re > tol).sum(axis=-1)
+    n_neg = (re < -tol).sum(axis=-1)
+    d = eigenvalues.shape[-1]
+    rotation = (np.abs(im) > tol).any(axis=-1)
+
+    kinds = np.where(n_pos == 0,
+                     np.where(rotation, STABLE_FOCUS, STABLE_NODE),
+                     np.where(n_neg == 0,
+                              np.where(rotation, UNSTABLE_FOCUS, UNSTABLE_NODE),
+                              np.where(rotation, SADDLE_FOCUS, SADDLE)))
+    kinds = np.where(n_pos + n_neg < d, NONHYPERBOLIC, kinds)
+    return kinds.tolist(), eigenvalues
+
+
+def is_stable(kind):
+    return kind in (STABLE_NODE, STABLE_FOCUS)
+
+
+def stability_color(kind):
+    """Цвет маркера: зеленый - устойчивое, красный - неустойчивое, оранжевый - негиперболическое"""
+    if kind == NONHYPERBOLIC:
+        return 'orange'
+    return 'green' if is_stable(kind) else 'red'
+
+
+def _param_derivative(rhs, x, mu, args, eps=1e-7):
+    """∂f/∂μ центральной разностью"""
+    return (rhs(x, mu + eps, *args) - rhs(x, mu - eps, *args)) / (2*eps)
+
+
+def _extended_jacobian(rhs, jac, y, args):
+    """Матрица [∂f/∂x | ∂f/∂μ] размера d x (d + 1) в точке y = (x, μ)"""
+    x, mu = y[:-1], y[-1]
+    return np.column_stack([jac(x, mu, *args), _param_derivative(rhs, x, mu, args)])
+
+
+def _tangent(extended, previous=None, direction=1.0):
+    """Единичная касательная к ветви - ядро расширенной матрицы Якоби"""
+    tangent = np.linalg.svd(extended)[2][-1]
+    if previous is not None:
+        sign = np.dot(tangent, previous)
+    else:
+        sign = direction * tangent[-1]
+    return -tangent if sign < 0 else tangent
+
+
+def locate_fold(rhs, jac, y, args=(), tol=1e-12, max_iter=20, eps=1e-7):
+    """
+    Уточнение точки поворота по приближению y = (x, μ): решается расширенная
+    система f(x, μ) = 0, J(x, μ) v = 0, (c, v) = 1 относительно (x, μ, v).
+    Возвращает уточненное (x, μ) или None, если Ньютон не сошелся.
+    """
+    d = len(y) - 1
+    c = np.linalg.svd(jac(y[:-1], y[-1], *args))[2][-1]
+    u = np.concatenate([y, c])
+
+    def residual(u):
+        x, mu, v = u[:d], u[d], u[d + 1:]
+        return np.concatenate([rhs(x, mu, *args), jac(x, mu, *args) @ v, [c @ v - 1]])
+
+    for _ in range(max_iter):
+        g = residual(u)
+        # Матрица Якоби расширенной системы - разностями вперед
+        shifts = u + eps * np.eye(len(u))
+        matrix = (np.array([residual(shift) for shift in shifts]) - g).T / eps
+        du = _solve(matrix, g)
+        u = u - du
+        if not np.isfinite(u).all():
+            return None
+        if np.linalg.norm(du) <= tol * (1 + np.linalg.norm(u)):
+            return u[:d + 1]
+    return None
+
+
+def _fold_guess(points):
+    """Вершина параболы μ(s) через три точки ветви, s - длина дуги"""
+    s = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+    coeffs = np.polyfit(s, points, 2)
+    a, b = coeffs[0, -1], coeffs[1, -1]
+    vertex = -b / (2*a) if a != 0 else s[1]
+    return coeffs[0] * vertex**2 + coeffs[1] * vertex + coeffs[2]
+
+
+def continue_branch(rhs, jac, x0, mu0, mu_range, args=(), direction=1.0, step=0.02,
+                    min_step=1e-6, max_step=0.1, max_points=5000, tol=1e-10):
+    """
+    Продолжение ветви равновесий из точки (x0, mu0) по длине дуги.
+    - direction: начальное направление по μ (+1 или -1)
+    - mu_range: (mu_min, mu_max); ветвь обрывается после выхода за интервал
+    Возвращает (mus, states): значения параметра (K,) и равновесия (K, d)
+    в порядке обхода ветви.
+    """
+    mu_min, mu_max = mu_range
+    y = np.append(np.asarray(x0, dtype=float), float(mu0))
+    tangent = _tangent(_extended_jacobian(rhs, jac, y, args), direction=direction)
+    branch = [y]
+    h = step
+
+    while len(branch) < max_points and mu_min <= y[-1] <= mu_max:
+        # Предиктор по касательной, корректор - Ньютон для f = 0 на гиперплоскости,
+        # перпендикулярной касательной
+        predicted = y + h * tangent
+        z = predicted.copy()
+        for iterations in range(1, 11):
+            x, mu = z[:-1], z[-1]
+            residual = np.append(rhs(x, mu, *args), np.dot(tangent, z - predicted))
+            matrix = np.vstack([_extended_jacobian(rhs, jac, z, args), tangent])
+            dz = _solve(matrix, residual)
+            z -= dz
+            if np.linalg.norm(dz) <= tol * (1 + np.linalg.norm(z)):
+                break
+        else:
+            iterations = None
+
+        if iterations is None or not np.isfinite(z).all():
+            h /= 2
+            if h < min_step:
+                break
+            continue
+
+        previous = tangent
+        tangent = _tangent(_extended_jacobian(rhs, jac, z, args), tangent)
+        # Смена знака dμ/ds - пройдена точка поворота
+        if previous[-1] * tangent[-1] < 0 and len(branch) >= 2:
+            fold = locate_fold(rhs, jac, _fold_guess(np.array(branch[-2:] + [z])), args)
+            if fold is not None:
+                branch.append(fold)
+        y = z
+        branch.append(y)
+        if iterations <= 3:
+            h = min(1.5*h, max_step)
+
+    branch = np.array(branch)
+    return branch[:, -1], branch[:, :-1]
+
+
+def trace_branches(rhs, jac, seeds, mu_range, args=(), **kwargs):
+    """
+    Ветви равновесий на интервале mu_range: равновесия, найденные из seeds
+    на обоих концах интервала, продолжаются внутрь него.
+    Возвращает список пар (mus, states), как у continue_branch.
+    """
+    mu_min, mu_max = mu_range
+    branches = []
+    for mu, direction in ((mu_min, 1.0), (mu_max, -1.0)):
+        for point in find_equilibria(rhs, jac, seeds, mu, args):
+            branches.append(continue_branch(rhs, jac, point, mu, mu_range, args,
+                                            direction=direction, **kwargs))
+    return branches
+
+
+def equilibria_at(branches, mu, rhs=None, jac=None, args=(), tol=1e-10):
+    """
+    Равновесия при данном μ по заранее прослеженным ветвям: точки пересечения
+    ветвей с уровнем μ (линейная интерполяция), уточненные методом Ньютона,
+    если заданы rhs и jac. Возвращает массив (M, d).
+    """
+    points = []
+    for mus, states in branches:
+        offset = mus - mu
+        # Точка поворота, лежащая ровно на уровне μ, дает пересечение
+        offset[np.abs(offset) < 1e-9] = 0.0
+        below, above = offset[:-1], offset[1:]
+        for k in np.nonzero(below * above <= 0)[0]:
+            span = mus[k + 1] - mus[k]
+            w = 0.0 if span == 0 else (mu - mus[k]) / span
+            points.append(states[k] + w * (states[k + 1] - states[k]))
+    if not points:
+        return np.empty((0, branches[0][1].shape[1] if branches else 0))
+
+    points = np.array(points)
+    if rhs is not None:
+        refined, converged = newton(rhs, jac, points, mu, args, tol, max_iter=10)
+        points = np.where(converged[:, None], refined, points)
+    return unique_points(points)
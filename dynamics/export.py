@@ -0,0 +1,225 @@
+"""Экспорт анимаций в кадры PNG (и видео) без окна.
+
+Сцена описывает, как продвигать состояние на один кадр и как его
+рисовать; рисование идет на фигуре Agg, дисплей не нужен. Без пула кадры
+считаются и рисуются за один проход. С пулом главный процесс продвигает
+состояние и отдает процессам копию состояния в начале каждого блока, а
+процессы досчитывают свои блоки и сохраняют кадры; копии снимаются по мере
+освобождения процессов, поэтому одновременно в памяти не больше двух
+копий на процесс. Готовая последовательность может быть собрана в видео
+через ffmpeg.
+
+Сцена - любой объект (передаваемый в процессы через pickle) с методами
+    advance(state) -> state   продвижение на один кадр (можно на месте),
+    setup(fig)                создание элементов графика,
+    draw(state, frame)        обновление элементов для кадра frame,
+и атрибутом figsize.
+"""
+import copy
+import os
+import shutil
+import subprocess
+import threading
+from multiprocessing import Pool
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from dynamics.maps import compact, workspace
+from dynamics.raster import SCALES, DensityRaster
+
+FRAME_PATTERN = 'frame_%06d.png'
+
+
+class MapScene:
+    def __init__(self, map_func, params, extent, title='', color='blue', density=False,
+                 scale='log', steps_per_frame=1, figsize=(8, 8), xlabel=None, ylabel=None):
+        """
+        Облако точек (2, N), итерируемое на месте ядром из dynamics.maps:
+        map_func(cloud, *params, steps=..., work=...). density включает
+        изображение плотности (DensityRaster) вместо scatter.
+        """
+        self.map_func = map_func
+        self.params = params
+        self.extent = extent
+        self.title = title
+        self.color = color
+        self.density = density
+        self.scale = scale
+        self.steps_per_frame = steps_per_frame
+        self.figsize = figsize
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.work = None
+
+    def __getstate__(self):
+        # Рабочий массив не передается в процессы, каждый выделяет свой
+        state = self.__dict__.copy()
+        state['work'] = None
+        return state
+
+    def advance(self, cloud):
+        if self.work is None or self.work.shape[1] < cloud.shape[1] \
+                or self.work.dtype != cloud.dtype:
+            self.work = workspace(self.map_func, cloud)
+        # Убегающие точки дают inf/NaN и выбрасываются из облака после кадра
+        with np.errstate(over='ignore', invalid='ignore'):
+            self.map_func(cloud, *self.params, steps=self.steps_per_frame,
+                          work=self.work[:, :cloud.shape[1]])
+        return compact(cloud)[0]
+
+    def setup(self, fig):
+        ax = fig.add_subplot(111)
+        xmin, xmax, ymin, ymax = self.extent
+        ax.set_xlim(xmin, xmax)
+        ax.set_ylim(ymin, ymax)
+        if self.xlabel:
+            ax.set_xlabel(self.xlabel)
+        if self.ylabel:
+            ax.set_ylabel(self.ylabel)
+        if self.density:
+            self.raster = DensityRaster(self.extent, scale=self.scale)
+            self.raster.attach(ax)
+        else:
+            self.scat = ax.scatter([], [], s=1, c=self.color)
+        self.ax = ax
+
+    def draw(self, cloud, frame):
+        if self.density:
+            self.raster.update(*cloud)
+        else:
+            self.scat.set_offsets(cloud.T)
+        label = f'Итерация: {frame * self.steps_per_frame}'
+        self.ax.set_title(f'{self.title}\n{label}' if self.title else label)
+
+
+def _frame_figure(scene):
+    fig = Figure(figsize=scene.figsize)
+    FigureCanvasAgg(fig)
+    scene.setup(fig)
+    return fig
+
+
+def _save_frame(scene, fig, state, frame, out_dir, dpi):
+    scene.draw(state, frame)
+    fig.savefig(os.path.join(out_dir, FRAME_PATTERN % frame), dpi=dpi)
+
+
+def _render_chunk(task):
+    """Кадры start..stop-1 одного блока; state - состояние кадра start"""
+    scene, state, start, stop, out_dir, dpi = task
+    fig = _frame_figure(scene)
+    for frame in range(start, stop):
+        if frame > start:
+            state = scene.advance(state)
+        _save_frame(scene, fig, state, frame, out_dir, dpi)
+    return stop - start
+
+
+def _chunk_tasks(scene, state, num_frames, chunk_size, out_dir, dpi, slots):
+    """
+    Задания блоков по одному. Пул забирает задания в отдельном потоке без
+    ограничения, поэтому копия состояния снимается только после освобождения
+    места в slots: остальные блоки еще не посчитаны, а не лежат в очереди.
+    """
+    for frame in range(num_frames):
+        if frame > 0:
+            state = scene.advance(state)
+        if frame % chunk_size == 0:
+            slots.acquire()
+            yield (scene, copy.deepcopy(state), frame, min(frame + chunk_size, num_frames),
+                   out_dir, dpi)
+
+
+def export_frames(scene, state, num_frames, out_dir, processes=None, chunk_size=None,
+                  dpi=100, video=None, fps=30, progress=None):
+    """
+    Кадры 0..num_frames-1 в out_dir/frame_NNNNNN.png; state - состояние кадра 0.
+    - processes: число процессов (None - все ядра, 1 - без пула)
+    - chunk_size: кадров в одном задании; по умолчанию около 4 блоков на процесс
+    - video: путь к видеофайлу, собираемому ffmpeg из кадров
+    - progress(done, total): вызывается по мере готовности блоков
+    Возвращает путь к видео или к каталогу кадров.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    processes = processes or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-num_frames // (4 * processes)))
+
+    done = [0]
+
+    def collect(count):
+        done[0] += count
+        if progress is not None:
+            progress(done[0], num_frames)
+
+    if processes == 1 or num_frames <= chunk_size:
+        # Один проход: состояние продвигается и рисуется без копий
+        fig = _frame_figure(scene)
+        for frame in range(num_frames):
+            if frame > 0:
+                state = scene.advance(state)
+            _save_frame(scene, fig, state, frame, out_dir, dpi)
+            if (frame + 1) % chunk_size == 0 or frame + 1 == num_frames:
+                collect((frame % chunk_size) + 1)
+    else:
+        # Блок в работе у каждого процесса и по одному ожидающему
+        slots = threading.Semaphore(2 * processes)
+        tasks = _chunk_tasks(scene, state, num_frames, chunk_size, out_dir, dpi, slots)
+        with Pool(processes) as pool:
+            for count in pool.imap_unordered(_render_chunk, tasks):
+                slots.release()
+                collect(count)
+
+    if video is None:
+        return out_dir
+    return encode_video(out_dir, video, fps)
+
+
+def encode_video(out_dir, video, fps=30):
+    """Сборка кадров out_dir в видео через ffmpeg (H.264, четные размеры кадра)"""
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("Для сборки видео нужен ffmpeg в PATH; кадры сохранены в " + out_dir)
+    subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-framerate', str(fps),
+                    '-i', os.path.join(out_dir, FRAME_PATTERN),
+                    '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                    '-c:v', 'libx264', '-pix_fmt', 'yuv420p', video], check=True)
+    return video
+
+
+def add_export_arguments(parser, frames=300):
+    """Общие ключи командной строки для экспорта кадров без окна"""
+    group = parser.add_argument_group("экспорт кадров без окна")
+    group.add_argument('--export', metavar='DIR',
+                       help="сохранить кадры в DIR вместо запуска окна")
+    group.add_argument('--frames', type=int, default=frames, help="число кадров")
+    group.add_argument('--processes', type=int, default=None,
+                       help="число процессов отрисовки (по умолчанию все ядра)")
+    group.add_argument('--dpi', type=int, default=100, help="разрешение кадров")
+    group.add_argument('--video', metavar='FILE', help="собрать кадры в видео (нужен ffmpeg)")
+    group.add_argument('--fps', type=int, default=30, help="кадров в секунду видео")
+    return group
+
+
+def add_map_arguments(parser, frames=300):
+    """Ключи экспорта для облаков точек: шаги на кадр и режим плотности"""
+    group = add_export_arguments(parser, frames)
+    group.add_argument('--steps-per-frame', type=int, default=1, help="итераций на кадр")
+    group.add_argument('--density', action='store_true', help="рисовать плотность облака")
+    group.add_argument('--scale', choices=SCALES, default='log', help="шкала плотности")
+    group.add_argument('--float32', dest='dtype', action='store_const', const=np.float32,
+                       default=np.float64, help="итерировать облако в одинарной точности")
+    return group
+
+
+def export_from_args(args, scene, state):
+    """Экспорт по разобранным ключам add_export_arguments с выводом прогресса"""
+    def report(done, total):
+        print(f"\rКадры: {done}/{total}", end='', flush=True)
+
+    result = export_frames(scene, state, args.frames, args.export, processes=args.processes,
+                           dpi=args.dpi, video=args.video, fps=args.fps, progress=report)
+    print(f"\nГотово: {result}")
+    return result
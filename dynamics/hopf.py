@@ -0,0 +1,37 @@
+"""Точное решение нормальной формы бифуркации Андронова-Хопфа.
+
+В полярных координатах система hopf_derivs распадается на
+    r' = (mu - r^2) r,   theta' = omega,   z' = -lambda_z z,
+и все три уравнения решаются явно:
+    r^2(t) = r0^2 E / (1 + r0^2 (E - 1) / mu),   E = exp(2 mu t),
+    theta(t) = theta0 + omega t,   z(t) = z0 exp(-lambda_z t).
+При mu = 0 множитель (E - 1) / mu заменяется пределом 2t.
+"""
+import numpy as np
+
+
+def hopf_trajectory(initial_conditions, t, mu, omega=1.0, lambda_z=1.0):
+    """
+    Траектории для набора начальных условий (N, 3) в моменты t.
+    Возвращает массив (N, 3, len(t)): для каждой траектории строки x, y, z,
+    как в sol.y у solve_ivp.
+    """
+    ic = np.atleast_2d(np.asarray(initial_conditions, dtype=float))
+    t = np.asarray(t, dtype=float)
+    x0, y0, z0 = ic[:, 0, None], ic[:, 1, None], ic[:, 2, None]
+
+    r0_sq = x0**2 + y0**2
+    growth = np.exp(2*mu*t)
+    # (E - 1) / mu без потери точности при малых mu
+    if mu == 0:
+        ratio = 2*t
+    else:
+        ratio = np.expm1(2*mu*t) / mu
+    r = np.sqrt(r0_sq * growth / (1 + r0_sq * ratio))
+    theta = np.arctan2(y0, x0) + omega*t
+
+    out = np.empty((len(ic), 3, len(t)))
+    out[:, 0] = r * np.cos(theta)
+    out[:, 1] = r * np.sin(theta)
+    out[:, 2] = z0 * np.exp(-lambda_z*t)
+    return out
@@ -0,0 +1,186 @@
+"""Необязательный JIT-бэкенд (numba) для циклов, не векторизуемых по времени.
+
+Шаг RK4 для Лоренца, уравнения в вариациях для показателей Ляпунова и
+длинные одиночные орбиты отображений - последовательные циклы по времени:
+NumPy выполняет каждый шаг как десяток вызовов ufunc над маленькими
+массивами, и почти все время уходит на накладные расходы Python. Здесь
+те же формулы записаны скалярными циклами и компилируются numba.njit,
+если numba установлен. Порядок арифметических операций совпадает с
+NumPy-версиями (dynamics.rk4, dynamics.maps), поэтому траектории
+совпадают побитно (показатели Ляпунова - с точностью до округления, так
+как QR заменен методом Грама-Шмидта). Без numba rk4, lyapunov и
+lorenz_maxima берут обычный путь NumPy, а орбиты отображений считаются
+теми же функциями на чистом Python.
+
+ENABLED - True, если компиляция доступна; переменная окружения
+DYNAMICS_JIT=0 отключает бэкенд даже при установленном numba.
+"""
+import math
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+ENABLED = numba is not None and os.environ.get('DYNAMICS_JIT', '1') != '0'
+
+
+def lorenz_params(r, sigma=10.0, b=8.0/3.0):
+    """Параметры Лоренца из args с умолчаниями systems.lorenz_derivs"""
+    return r, sigma, b
+
+
+def jit(func):
+    """numba.njit при доступном бэкенде, иначе сама функция (чистый Python)"""
+    if ENABLED:
+        return numba.njit(cache=True, nogil=True)(func)
+    return func
+
+
+@jit
+def _lorenz_rhs(x, y, z, r, sigma, b):
+    # Те же операции, что в systems.lorenz_derivs
+    return (y - x)*sigma, r*x - y - x*z, x*y - b*z
+
+
+@jit
+def _lorenz_rk4(x, y, z, r, sigma, b, h):
+    """Один шаг RK4 в порядке операций dynamics.rk4.rk4_step"""
+    k1x, k1y, k1z = _lorenz_rhs(x, y, z, r, sigma, b)
+    k2x, k2y, k2z = _lorenz_rhs(k1x*(h/2) + x, k1y*(h/2) + y, k1z*(h/2) + z, r, sigma, b)
+    k3x, k3y, k3z = _lorenz_rhs(k2x*(h/2) + x, k2y*(h/2) + y, k2z*(h/2) + z, r, sigma, b)
+    k4x, k4y, k4z = _lorenz_rhs(k3x*h + x, k3y*h + y, k3z*h + z, r, sigma, b)
+    return (x + ((k2x + k3x)*2 + k1x + k4x)*(h/6),
+            y + ((k2y + k3y)*2 + k1y + k4y)*(h/6),
+            z + ((k2z + k3z)*2 + k1z + k4z)*(h/6))
+
+
+@jit
+def lorenz_trajectory(out, r, sigma, b, h):
+    """Заполнение out[1:] формы (num_steps, N, 3) шагами RK4 из out[0]; r формы (N,)"""
+    for n in range(out.shape[1]):
+        x, y, z = out[0, n, 0], out[0, n, 1], out[0, n, 2]
+        for i in range(1, out.shape[0]):
+            x, y, z = _lorenz_rk4(x, y, z, r[n], sigma, b, h)
+            out[i, n, 0] = x
+            out[i, n, 1] = y
+            out[i, n, 2] = z
+    return out
+
+
+@jit
+def lorenz_advance(state, r, sigma, b, h, num_steps, z_out):
+    """
+    num_steps шагов RK4 для состояний state (N, 3) на месте. Если в z_out
+    (steps, N) есть строки, в z_out[i] записывается z после шага i.
+    """
+    record = z_out.shape[0] > 0
+    for n in range(state.shape[0]):
+        x, y, z = state[n, 0], state[n, 1], state[n, 2]
+        for i in range(num_steps):
+            x, y, z = _lorenz_rk4(x, y, z, r[n], sigma, b, h)
+            if record:
+                z_out[i, n] = z
+        state[n, 0] = x
+        state[n, 1] = y
+        state[n, 2] = z
+    return state
+
+
+@jit
+def _lorenz_tangent(u, r, sigma, b, out):
+    """Правая часть Лоренца с уравнениями в вариациях: u = [x, y, z, Q (3x3 по строкам)]"""
+    x, y, z = u[0], u[1], u[2]
+    out[0], out[1], out[2] = _lorenz_rhs(x, y, z, r, sigma, b)
+    for j in range(3):
+        q0, q1, q2 = u[3 + j], u[6 + j], u[9 + j]
+        out[3 + j] = -sigma*q0 + sigma*q1
+        out[6 + j] = (r - z)*q0 - q1 - x*q2
+        out[9 + j] = y*q0 + x*q1 - b*q2
+
+
+@jit
+def lorenz_lyapunov(state, r, sigma, b, dt, num_steps, transient, renorm_every):
+    """
+    Спектр Ляпунова системы Лоренца для состояний state (N, 3) и параметров
+    r, sigma, b формы (N,), как lyapunov_spectrum. Переортогонализация -
+    модифицированным методом Грама-Шмидта; диагональ R у него положительна,
+    как у QR с переносом знаков в lyapunov_spectrum.
+    """
+    n_traj = state.shape[0]
+    spectrum = np.empty((n_traj, 3))
+    u = np.empty(12)
+    k1 = np.empty(12)
+    k2 = np.empty(12)
+    k3 = np.empty(12)
+    k4 = np.empty(12)
+    tmp = np.empty(12)
+    for n in range(n_traj):
+        x, y, z = state[n, 0], state[n, 1], state[n, 2]
+        for _ in range(transient):
+            x, y, z = _lorenz_rk4(x, y, z, r[n], sigma[n], b[n], dt)
+        u[0], u[1], u[2] = x, y, z
+        for k in range(9):
+            u[3 + k] = 1.0 if k % 4 == 0 else 0.0
+
+        log_sum = np.zeros(3)
+        for i in range(1, num_steps + 1):
+            _lorenz_tangent(u, r[n], sigma[n], b[n], k1)
+            for k in range(12):
+                tmp[k] = k1[k]*(dt/2) + u[k]
+            _lorenz_tangent(tmp, r[n], sigma[n], b[n], k2)
+            for k in range(12):
+                tmp[k] = k2[k]*(dt/2) + u[k]
+            _lorenz_tangent(tmp, r[n], sigma[n], b[n], k3)
+            for k in range(12):
+                tmp[k] = k3[k]*dt + u[k]
+            _lorenz_tangent(tmp, r[n], sigma[n], b[n], k4)
+            for k in range(12):
+                u[k] = u[k] + ((k2[k] + k3[k])*2 + k1[k] + k4[k])*(dt/6)
+
+            if i % renorm_every == 0 or i == num_steps:
+                # Столбцы Q: u[3 + j], u[6 + j], u[9 + j]
+                for j in range(3):
+                    for m in range(j):
+                        dot = u[3 + m]*u[3 + j] + u[6 + m]*u[6 + j] + u[9 + m]*u[9 + j]
+                        u[3 + j] -= dot*u[3 + m]
+                        u[6 + j] -= dot*u[6 + m]
+                        u[9 + j] -= dot*u[9 + m]
+                    norm = math.sqrt(u[3 + j]**2 + u[6 + j]**2 + u[9 + j]**2)
+                    log_sum[j] += math.log(norm)
+                    u[3 + j] /= norm
+                    u[6 + j] /= norm
+                    u[9 + j] /= norm
+        spectrum[n] = -np.sort(-log_sum / (num_steps*dt))
+    return spectrum
+
+
+@jit
+def henon_orbit(x, y, lam, b, num_steps):
+    """Орбита отображения Эно из (x, y): массив (num_steps, 2) точек после каждой итерации"""
+    out = np.empty((num_steps, 2))
+    for i in range(num_steps):
+        # Порядок операций как в maps.henon
+        t = x*x*lam + y*b
+        x, y = 1 - t, x
+        out[i, 0] = x
+        out[i, 1] = y
+    return out
+
+
+@jit
+def zaslavsky_orbit(theta, p, K, gamma, omega, num_steps):
+    """Орбита отображения Заславского из (θ, p): массив (num_steps, 2) точек (θ, p)"""
+    out = np.empty((num_steps, 2))
+    damping = 1 - gamma
+    two_pi = 2*np.pi
+    for i in range(num_steps):
+        # Порядок операций как в maps.zaslavsky
+        p = p*damping + math.sin(theta)*K + omega
+        theta = (theta + p) % two_pi
+        out[i, 0] = theta
+        out[i, 1] = p
+    return out
@@ -0,0 +1,124 @@
+"""Максимумы z системы Лоренца: бифуркационная диаграмма по ρ и отображение Лоренца.
+
+Траектории для всех значений ρ блока интегрируются пакетным RK4. Хранится
+только z на коротком отрезке времени, а локальные максимумы ищутся сразу
+по всему блоку сравнением соседних значений и уточняются параболой по
+трем точкам. Блоки значений ρ распределяются по пулу процессов,
+о ходе расчета сообщает функция progress(done, total). С numba (dynamics.jit)
+шаги RK4 внутри блока выполняются скомпилированным циклом.
+"""
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from dynamics import jit
+from dynamics.rk4 import rk4_step, rk4_workspace
+from dynamics.systems import lorenz_derivs
+
+
+def find_maxima(z):
+    """
+    Локальные максимумы по оси времени массива z формы (steps, N).
+    Возвращает номера траекторий и уточненные значения максимумов,
+    упорядоченные по времени внутри каждой траектории.
+    """
+    left, mid, right = z[:-2], z[1:-1], z[2:]
+    step, index = np.nonzero((mid > left) & (mid >= right))
+    z0, z1, z2 = left[step, index], mid[step, index], right[step, index]
+    # Вершина параболы через три точки
+    curvature = z0 - 2*z1 + z2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        peak = np.where(curvature < 0, z1 - (z2 - z0)**2 / (8*curvature), z1)
+    order = np.lexsort((step, index))
+    return index[order], peak[order]
+
+
+def lorenz_z_maxima(rho, sigma=10.0, beta=8.0/3.0, initial_state=(1.0, 1.0, 1.0),
+                    h=0.01, t_transient=50.0, t_record=100.0, block=1000):
+    """
+    Максимумы z после переходного процесса для каждого значения rho.
+    Возвращает (index, zmax): номер значения rho и величину каждого максимума.
+    """
+    rho = np.atleast_1d(np.asarray(rho, dtype=float))
+    state = np.broadcast_to(np.asarray(initial_state, dtype=float), (len(rho), 3)).copy()
+    args = (rho, sigma, beta)
+    work = rk4_workspace(state.shape)
+
+    def advance(num_steps, z_out):
+        # Шаги RK4 с записью z после каждого шага в строки z_out (если они есть)
+        if jit.ENABLED:
+            jit.lorenz_advance(state, rho, float(sigma), float(beta), float(h), num_steps, z_out)
+            return
+        for i in range(num_steps):
+            rk4_step(lorenz_derivs, state, h, args, out=state, work=work)
+            if len(z_out):
+                z_out[i] = state[:, 2]
+
+    advance(int(t_transient / h), np.empty((0, len(rho))))
+
+    # Буфер z с двумя строками перекрытия, чтобы не терять максимумы на стыках блоков
+    z = np.empty((block + 2, len(rho)))
+    z[0] = z[1] = state[:, 2]
+    found_index, found_peak = [], []
+    remaining = int(t_record / h)
+    while remaining > 0:
+        n = min(block, remaining)
+        advance(n, z[2:n + 2])
+        index, peak = find_maxima(z[:n + 2])
+        found_index.append(index)
+        found_peak.append(peak)
+        z[:2] = z[n:n + 2]
+        remaining -= n
+
+    index = np.concatenate(found_index)
+    order = np.argsort(index, kind='stable')
+    return index[order], np.concatenate(found_peak)[order]
+
+
+def _maxima_chunk(task):
+    start, rho, kwargs = task
+    index, zmax = lorenz_z_maxima(rho, **kwargs)
+    return start, index + start, zmax
+
+
+def lorenz_maxima_sweep(rho_values, processes=None, chunk_size=None, progress=None, **kwargs):
+    """
+    Бифуркационная диаграмма ρ - z_max на пуле процессов.
+    - kwargs передаются в lorenz_z_maxima (sigma, beta, h, t_transient, ...)
+    - progress(done, total): вызывается после каждого готового блока
+    Возвращает (index, zmax), как lorenz_z_maxima, для всего rho_values.
+    """
+    rho_values = np.asarray(rho_values, dtype=float).ravel()
+    n = len(rho_values)
+    processes = processes or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-n // (4 * processes)))
+    tasks = [(start, rho_values[start:start + chunk_size], kwargs)
+             for start in range(0, n, chunk_size)]
+
+    results = []
+
+    def collect(start, index, zmax):
+        results.append((index, zmax))
+        if progress is not None:
+            progress(len(results), len(tasks))
+
+    if processes == 1 or len(tasks) == 1:
+        for task in tasks:
+            collect(*_maxima_chunk(task))
+    else:
+        with Pool(processes) as pool:
+            for chunk in pool.imap_unordered(_maxima_chunk, tasks):
+                collect(*chunk)
+
+    index = np.concatenate([r[0] for r in results])
+    zmax = np.concatenate([r[1] for r in results])
+    order = np.argsort(index, kind='stable')
+    return index[order], zmax[order]
+
+
+def lorenz_return_map(index, zmax):
+    """Пары последовательных максимумов (z_n, z_{n+1}) одной и той же траектории"""
+    same = index[1:] == index[:-1]
+    return zmax[:-1][same], zmax[1:][same]
@@ -0,0 +1,85 @@
+"""Спектр показателей Ляпунова непрерывных систем.
+
+Вместе с траекторией x интегрируются уравнения в вариациях dQ/dt = J(x) Q
+для d касательных векторов. Через каждые renorm_every шагов векторы
+переортогонализуются QR-разложением, которое выполняется сразу для всего
+пакета из N начальных условий, а логарифмы диагонали R накапливаются.
+
+Пример: спектр системы Лоренца на сетке значений rho
+
+    rho = np.linspace(0.1, 50, 500)
+    spectrum = lyapunov_spectrum(lorenz_derivs, lorenz_jacobian, (1.0, 1.0, 1.0),
+                                 dt=0.01, num_steps=20000, args=(rho, 10.0, 8/3),
+                                 transient=2000)
+
+Другие системы из systems.py подставляются так же:
+hopf_derivs/hopf_jacobian (mu, omega, lambda_z), van_der_pol_derivs/
+van_der_pol_jacobian (lam), double_pendulum_derivs/double_pendulum_jacobian
+(L1, L2, m1, m2, g).
+
+Для системы Лоренца при доступном numba (dynamics.jit) весь расчет идет
+скомпилированным циклом по каждой траектории.
+"""
+import numpy as np
+
+from dynamics import jit
+from dynamics.rk4 import rk4_step, rk4_workspace
+from dynamics.systems import lorenz_derivs, lorenz_jacobian
+
+
+def _tangent_rhs(rhs, jac, d):
+    """Правая часть расширенной системы: состояние (..., d + d*d) = [x, Q]"""
+    def augmented(y, *args, out=None):
+        x = y[..., :d]
+        Q = y[..., d:].reshape(y.shape[:-1] + (d, d))
+        rhs(x, *args, out=out[..., :d])
+        J = jac(x, *args)
+        out[..., d:] = np.matmul(J, Q).reshape(y.shape[:-1] + (d * d,))
+        return out
+    return augmented
+
+
+def lyapunov_spectrum(rhs, jac, state0, dt, num_steps, args=(), transient=0, renorm_every=1):
+    """
+    Полный спектр показателей Ляпунова для пакета начальных условий.
+    - rhs(state, *args, out=...): векторизованная правая часть, state формы (N, d)
+    - jac(state, *args): матрицы Якоби формы (N, d, d)
+    - state0: (d,) или (N, d); параметры в args могут быть массивами (N,)
+    - transient: число шагов, отбрасываемых до начала усреднения
+    Возвращает массив (N, d) показателей в порядке убывания.
+    """
+    state0 = np.asarray(state0, dtype=float)
+    d = state0.shape[-1]
+    n = max([len(state0) if state0.ndim > 1 else 1] +
+            [np.size(a) for a in args if np.ndim(a) > 0])
+    x = np.broadcast_to(state0, (n, d)).copy()
+
+    if jit.ENABLED and rhs is lorenz_derivs and jac is lorenz_jacobian:
+        r, sigma, b = (np.broadcast_to(np.asarray(a, dtype=float), (n,)).copy()
+                       for a in jit.lorenz_params(*args))
+        return jit.lorenz_lyapunov(x, r, sigma, b, float(dt), num_steps, transient, renorm_every)
+
+    # Выход на аттрактор без касательных векторов
+    work = rk4_workspace(x.shape)
+    for _ in range(transient):
+        rk4_step(rhs, x, dt, args, out=x, work=work)
+
+    y = np.empty((n, d + d * d))
+    y[:, :d] = x
+    Q = y[:, d:].reshape(n, d, d)
+    Q[:] = np.eye(d)
+
+    augmented = _tangent_rhs(rhs, jac, d)
+    work = rk4_workspace(y.shape)
+    log_sum = np.zeros((n, d))
+    for i in range(1, num_steps + 1):
+        rk4_step(augmented, y, dt, args, out=y, work=work)
+        if i % renorm_every == 0 or i == num_steps:
+            q, r = np.linalg.qr(y[:, d:].reshape(n, d, d))
+            diag = np.diagonal(r, axis1=1, axis2=2)
+            log_sum += np.log(np.abs(diag))
+            # Знак диагонали R переносится в Q, чтобы базис не менял ориентацию
+            y[:, d:] = (q * np.sign(diag)[:, None, :]).reshape(n, d * d)
+
+    spectrum = log_sum / (num_steps * dt)
+    return -np.sort(-spectrum, axis=1)
@@ -0,0 +1,129 @@
+"""Орбитальная (бифуркационная) диаграмма отображения Эно по параметру λ.
+
+Для каждого λ отображение x' = 1 - λx² - by, y' = x итерируется сразу для
+всех значений параметра: после отбрасывания переходного процесса
+записываются n_record значений x. Значения λ обрабатываются блоками,
+поэтому рабочая память ограничена размером блока, а блоки распределяются
+по пулу процессов. Готовая диаграмма сохраняется в .npy по хешу параметров
+и при повторном запросе открывается с диска без пересчета.
+
+long_orbit строит одну длинную орбиту (аттрактор Эно, стохастическую
+паутину Заславского) скомпилированными циклами dynamics.jit.
+"""
+import hashlib
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from dynamics.raster import DensityRaster
+
+
+def henon_orbits(lambdas, b, x0, y0, n_transient, n_record, dtype=np.float32):
+    """Значения x после переходного процесса, массив (len(lambdas), n_record)"""
+    lam = np.asarray(lambdas, dtype=float)
+    x = np.full(lam.shape, x0)
+    y = np.full(lam.shape, y0)
+    tmp = np.empty_like(x)
+    out = np.empty((len(lam), n_record), dtype=dtype)
+
+    # Убегающие на бесконечность орбиты дают inf/NaN и просто не попадают на диаграмму
+    with np.errstate(over='ignore', invalid='ignore'):
+        for i in range(n_transient + n_record):
+            # x, y = 1 - λx² - by, x
+            np.multiply(x, x, out=tmp)
+            tmp *= lam
+            np.subtract(1.0, tmp, out=tmp)
+            y *= b
+            tmp -= y
+            x, y, tmp = tmp, x, y
+            if i >= n_transient:
+                out[:, i - n_transient] = x
+    return out
+
+
+def _orbit_chunk(task):
+    start, lambdas, b, x0, y0, n_transient, n_record, dtype = task
+    return start, henon_orbits(lambdas, b, x0, y0, n_transient, n_record, dtype)
+
+
+def cache_path(cache_dir, lambdas, b, x0, y0, n_transient, n_record, dtype):
+    """Имя файла кеша, зависящее от всех параметров расчета"""
+    key = hashlib.sha1()
+    key.update(np.ascontiguousarray(lambdas, dtype=float).tobytes())
+    key.update(repr((b, x0, y0, n_transient, n_record, np.dtype(dtype).str)).encode())
+    return os.path.join(cache_dir, f"henon_orbit_{key.hexdigest()[:16]}.npy")
+
+
+def henon_orbit_diagram(lambdas, b=0.3, n_transient=1000, n_record=1000, x0=0.1, y0=0.1,
+                        chunk_size=1000, processes=None, cache_dir=None, dtype=np.float32):
+    """
+    Орбитальная диаграмма: массив (len(lambdas), n_record) значений x.
+    - chunk_size: число значений λ в одном задании пула
+    - processes: число процессов (None - все ядра, 1 - без пула)
+    - cache_dir: каталог кеша .npy; результат тогда возвращается как memmap
+      и пишется на диск по мере готовности блоков
+    """
+    lambdas = np.asarray(lambdas, dtype=float).ravel()
+    n = len(lambdas)
+    shape = (n, n_record)
+
+    path = None
+    if cache_dir is not None:
+        path = cache_path(cache_dir, lambdas, b, x0, y0, n_transient, n_record, dtype)
+        if os.path.exists(path):
+            return np.load(path, mmap_mode='r')
+        os.makedirs(cache_dir, exist_ok=True)
+        partial = path + '.part'
+        result = np.lib.format.open_memmap(partial, mode='w+', dtype=dtype, shape=shape)
+    else:
+        result = np.empty(shape, dtype=dtype)
+
+    tasks = [
+        (start, lambdas[start:start + chunk_size], b, x0, y0, n_transient, n_record, dtype)
+        for start in range(0, n, chunk_size)
+    ]
+    if processes == 1 or len(tasks) == 1:
+        for start, orbits in map(_orbit_chunk, tasks):
+            result[start:start + len(orbits)] = orbits
+    else:
+        with Pool(processes) as pool:
+            for start, orbits in pool.imap_unordered(_orbit_chunk, tasks):
+                result[start:start + len(orbits)] = orbits
+
+    if path is not None:
+        result.flush()
+        del result
+        # Файл появляется под своим именем только целиком записанным
+        os.replace(partial, path)
+        return np.load(path, mmap_mode='r')
+    return result
+
+
+def long_orbit(orbit, start, params, n_transient=1000, n_points=10**6):
+    """
+    Одна орбита из n_points точек после n_transient итераций переходного
+    процесса, массив (n_points, 2).
+    - orbit: jit.henon_orbit или jit.zaslavsky_orbit (без numba - чистый Python)
+    - start: начальная точка, params: параметры отображения после координат
+    """
+    x, y = start
+    if n_transient:
+        x, y = orbit(x, y, *params, n_transient)[-1]
+    return orbit(x, y, *params, n_points)
+
+
+def plot_orbit_density(ax, points, bins=(700, 700), scale='log'):
+    """
+    Плотность точек орбиты на осях ax; область - по конечным точкам.
+    Возвращает False, если орбита ушла на бесконечность.
+    """
+    finite = points[np.isfinite(points).all(axis=1)]
+    if not len(finite):
+        return False
+    (xmin, ymin), (xmax, ymax) = finite.min(axis=0), finite.max(axis=0)
+    pad_x, pad_y = 0.02*(xmax - xmin) or 0.5, 0.02*(ymax - ymin) or 0.5
+    raster = DensityRaster((xmin - pad_x, xmax + pad_x, ymin - pad_y, ymax + pad_y),
+                           bins=bins, scale=scale)
+    raster.attach(ax).set_data(raster.normalize(raster.histogram(*finite.T)))
+    return True
@@ -0,0 +1,97 @@
+"""Пакетный метод Рунге-Кутты 4-го порядка с фиксированным шагом.
+
+Один шаг продвигает сразу весь массив состояний (N, d), поэтому цикл
+по времени на Python выполняется один раз для всех траекторий,
+а не для каждой траектории и каждой координаты отдельно. Если доступен
+numba (dynamics.jit), solve_lorenz выполняет тот же цикл скомпилированным.
+"""
+import numpy as np
+
+from dynamics import jit
+from dynamics.systems import lorenz_derivs
+
+
+def rk4_workspace(shape, dtype=float):
+    """Рабочие буферы для rk4_step: k1, k2, k3, k4 и промежуточное состояние"""
+    return np.empty((5,) + tuple(shape), dtype=dtype)
+
+
+def rk4_step(rhs, state, h, args=(), out=None, work=None):
+    """
+    Один шаг RK4 для массива состояний.
+    - rhs(state, *args, out=...): правая часть, записывающая производные в out
+    - out: массив для нового состояния (может совпадать с state)
+    - work: буферы из rk4_workspace, чтобы не выделять память на каждом шаге
+    """
+    if out is None:
+        out = np.empty_like(state)
+    if work is None:
+        work = rk4_workspace(state.shape, state.dtype)
+    k1, k2, k3, k4, tmp = work
+
+    rhs(state, *args, out=k1)
+    np.multiply(k1, h/2, out=tmp)
+    tmp += state
+    rhs(tmp, *args, out=k2)
+    np.multiply(k2, h/2, out=tmp)
+    tmp += state
+    rhs(tmp, *args, out=k3)
+    np.multiply(k3, h, out=tmp)
+    tmp += state
+    rhs(tmp, *args, out=k4)
+
+    # y + (k1 + 2*k2 + 2*k3 + k4)*h/6
+    np.add(k2, k3, out=tmp)
+    tmp *= 2
+    tmp += k1
+    tmp += k4
+    tmp *= h/6
+    np.add(state, tmp, out=out)
+    return out
+
+
+def rk4_integrate(rhs, state0, h, num_steps, args=(), out=None):
+    """
+    Интегрирование на num_steps точек (включая начальную).
+    Результат записывается в предвыделенный массив out формы (num_steps, N, d).
+    """
+    state0 = np.asarray(state0, dtype=float)
+    if out is None:
+        out = np.empty((num_steps,) + state0.shape)
+    elif out.shape != (num_steps,) + state0.shape:
+        raise ValueError(f"Ожидался массив формы {(num_steps,) + state0.shape}, получен {out.shape}")
+
+    out[0] = state0
+    work = rk4_workspace(state0.shape, out.dtype)
+    for i in range(num_steps - 1):
+        rk4_step(rhs, out[i], h, args, out=out[i+1], work=work)
+    return out
+
+
+def solve_lorenz(r, initial_conditions, t_start, t_end, h, sigma=10.0, b=8.0/3.0, out=None):
+    """
+    Траектории системы Лоренца для набора значений r и начальных условий.
+    - r: скаляр или массив (N,)
+    - initial_conditions: (3,) или (N, 3)
+    Возвращает t формы (num_steps,) и состояния формы (num_steps, N, 3).
+    """
+    num_steps = int((t_end - t_start) / h)
+    t = np.linspace(t_start, t_end, num_steps)
+
+    r = np.atleast_1d(np.asarray(r, dtype=float))
+    ic = np.atleast_2d(np.asarray(initial_conditions, dtype=float))
+    n = max(len(r), len(ic))
+    r = np.broadcast_to(r, (n,))
+    state0 = np.broadcast_to(ic, (n, 3))
+
+    if not jit.ENABLED:
+        states = rk4_integrate(lorenz_derivs, state0, h, num_steps, args=(r, sigma, b), out=out)
+        return t, states
+
+    if out is None:
+        out = np.empty((num_steps, n, 3))
+    elif out.shape != (num_steps, n, 3):
+        raise ValueError(f"Ожидался массив формы {(num_steps, n, 3)}, получен {out.shape}")
+    out[0] = state0
+    jit.lorenz_trajectory(out, np.ascontiguousarray(r), float(sigma), float(b), float(h))
+    return t, out
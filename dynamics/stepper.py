@@ -0,0 +1,73 @@
+"""Постоянный интегратор с фиксированным шагом для анимаций.
+
+Вместо запуска решателя заново на каждом кадре интегратор хранит
+текущее состояние и рабочие буферы RK4, а следующие состояния
+вычисляет блоками заранее: кадр анимации только читает готовые значения.
+"""
+import numpy as np
+
+from dynamics.rk4 import rk4_step, rk4_workspace
+
+
+class FixedStepper:
+    def __init__(self, rhs, state, dt, args=(), substeps=1, lookahead=1, observe=None):
+        """
+        - rhs(state, *args, out=...): правая часть системы
+        - dt: шаг по времени между соседними кадрами
+        - substeps: число шагов RK4 внутри одного dt
+        - lookahead: сколько кадров вычислять за один раз
+        - observe(states): функция от блока состояний (lookahead, ...),
+          результат которой (например, координаты для отрисовки) хранится
+          вместе с состояниями
+        """
+        self.rhs = rhs
+        self.dt = dt
+        self.args = args
+        self.substeps = substeps
+        self.lookahead = lookahead
+        self.observe = observe
+        self.reset(state)
+
+    def reset(self, state):
+        """Новое начальное состояние; предвычисленные кадры сбрасываются"""
+        self.state = np.array(state, dtype=float)
+        self._frontier = self.state.copy()
+        self._work = rk4_workspace(self.state.shape)
+        self._states = np.empty((0,) + self.state.shape)
+        self._observed = None
+        self._pos = 0
+        self.time = 0.0
+
+    def step(self, state):
+        """Продвижение state на dt на месте"""
+        h = self.dt / self.substeps
+        for _ in range(self.substeps):
+            rk4_step(self.rhs, state, h, self.args, out=state, work=self._work)
+        return state
+
+    def advance(self, n):
+        """Вычисление n следующих состояний после уже предвычисленных"""
+        block = np.empty((n,) + self._frontier.shape)
+        for i in range(n):
+            block[i] = self.step(self._frontier)
+        return block
+
+    def prefetch(self):
+        """Заполнение буфера следующими lookahead кадрами"""
+        self._states = self.advance(self.lookahead)
+        self._observed = self.observe(self._states) if self.observe else None
+        self._pos = 0
+
+    def next(self):
+        """
+        Переход к следующему кадру.
+        Возвращает (state, observed), где observed - значение observe для этого
+        кадра или None.
+        """
+        if self._pos >= len(self._states):
+            self.prefetch()
+        i = self._pos
+        self._pos += 1
+        self.state = self._states[i]
+        self.time += self.dt
+        return self.state, (None if self._observed is None else self._observed[i])
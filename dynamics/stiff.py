@@ -0,0 +1,141 @@
+"""Выбор явного или неявного метода для жестких систем (Ван-дер-Поль при больших λ).
+
+При λ порядка 100-1000 решение уравнения Ван-дер-Поля - релаксационные
+колебания: медленный дрейф вдоль ветвей |x| > √λ, где собственное число
+матрицы Якоби порядка -λ, и быстрые срывы между ними. Явный RK45 на
+медленных участках ограничен не точностью, а устойчивостью (h ≲ 3/|λ_max|)
+и делает миллионы крошечных шагов. Неявные LSODA/Radau/BDF с аналитической
+матрицей Якоби идут там крупными шагами (LSODA быстрее всех: его шаг
+реализован на Фортране, у Radau и BDF - на Python).
+
+solve оценивает жесткость пробным участком явного метода: вдоль него
+считается спектральный радиус матрицы Якоби ρ, и если на всем отрезке
+явному методу понадобилось бы больше stiff_steps шагов только ради
+устойчивости (span·ρ/3), выбирается неявный метод. Вместе с решением
+возвращается сводка: метод, оценка жесткости, число шагов, вычислений
+правой части и матрицы Якоби, LU-разложений и время расчета.
+"""
+import time
+
+import numpy as np
+from scipy.integrate import RK45, solve_ivp
+
+from dynamics.systems import van_der_pol_derivs, van_der_pol_jacobian
+
+# Граница области устойчивости RK45 на отрицательной полуоси (с запасом)
+EXPLICIT_STABILITY = 3.0
+
+
+def spectral_radius(jac, states, args=()):
+    """Наибольший модуль собственного числа матрицы Якоби для состояний (n, d)"""
+    matrices = jac(np.asarray(states, dtype=float), *args)
+    return float(np.abs(np.linalg.eigvals(matrices)).max())
+
+
+def estimate_stiffness(rhs, jac, t_span, y0, args=(), pilot_steps=200):
+    """
+    Оценка жесткости по пробному участку RK45 из не более pilot_steps шагов.
+    Возвращает (rho, explicit_steps): наибольший спектральный радиус матрицы
+    Якоби на участке и число шагов, которое явному методу понадобилось бы на
+    всем отрезке по условию устойчивости.
+    """
+    def fun(t, y):
+        return rhs(y, *args)
+
+    solver = RK45(fun, t_span[0], np.asarray(y0, dtype=float), t_span[1])
+    states = [solver.y.copy()]
+    for _ in range(pilot_steps):
+        if solver.status != 'running':
+            break
+        solver.step()
+        states.append(solver.y.copy())
+    rho = spectral_radius(jac, states, args)
+    span = abs(t_span[1] - t_span[0])
+    return rho, span * rho / EXPLICIT_STABILITY
+
+
+def solve(rhs, jac, t_span, y0, args=(), method='auto', stiff_method='LSODA',
+          stiff_steps=20000, t_eval=None, rtol=1e-6, atol=1e-9, **kwargs):
+    """
+    Решение solve_ivp для правой части rhs(state, *args) с матрицей Якоби
+    jac(state, *args) (соглашения dynamics.systems).
+    - method: 'auto' - RK45 или stiff_method по оценке estimate_stiffness,
+      иначе имя метода solve_ivp; неявным методам передается jac
+    - t_eval: точки вывода; шаги метода при этом не ограничиваются, значения
+      в t_eval берутся из плотного вывода
+    Возвращает (sol, stats), stats - словарь со сводкой расчета.
+    """
+    stats = {}
+    if method == 'auto':
+        rho, explicit_steps = estimate_stiffness(rhs, jac, t_span, y0, args)
+        stats.update(rho=rho, explicit_steps=explicit_steps)
+        method = stiff_method if explicit_steps > stiff_steps else 'RK45'
+
+    def fun(t, y):
+        return rhs(y, *args)
+
+    if method in ('Radau', 'BDF', 'LSODA'):
+        kwargs['jac'] = lambda t, y: jac(y, *args)
+
+    if t_eval is not None:
+        kwargs['dense_output'] = True
+
+    start = time.perf_counter()
+    sol = solve_ivp(fun, t_span, np.asarray(y0, dtype=float), method=method, rtol=rtol,
+                    atol=atol, **kwargs)
+    seconds = time.perf_counter() - start
+    # Без t_eval sol.t - узлы шагов метода, поэтому их число считается до подстановки t_eval
+    stats.update(method=method, success=sol.success, n_steps=len(sol.t) - 1, nfev=sol.nfev,
+                 njev=sol.njev, nlu=sol.nlu, seconds=seconds)
+    if t_eval is not None and sol.success:
+        sol.t = np.asarray(t_eval, dtype=float)
+        sol.y = sol.sol(sol.t)
+    return sol, stats
+
+
+def relaxation_period(lam):
+    """
+    Приближенный период цикла Ван-дер-Поля: 2π при малых λ и
+    (3 - 2 ln 2)λ в релаксационном режиме
+    """
+    return max(2*np.pi, (3 - 2*np.log(2)) * lam)
+
+
+def solve_van_der_pol(lam, y0=(2.0, 0.0), t_span=None, periods=3, **kwargs):
+    """
+    Уравнение Ван-дер-Поля при данном λ через solve; по умолчанию отрезок -
+    periods приближенных периодов цикла. Возвращает (sol, stats).
+    """
+    if t_span is None:
+        t_span = (0.0, periods * relaxation_period(lam))
+    return solve(van_der_pol_derivs, van_der_pol_jacobian, t_span, y0, args=(lam,), **kwargs)
+
+
+def sweep_lambda(lambdas, y0=(2.0, 0.0), periods=3, num_points=2000, progress=None, **kwargs):
+    """
+    Перебор λ: для каждого значения решение на periods периодах с выводом
+    в num_points равноотстоящих точках.
+    - progress(lam, stats): вызывается после каждого расчета
+    Возвращает список (lam, sol, stats).
+    """
+    results = []
+    for lam in lambdas:
+        t_end = periods * relaxation_period(lam)
+        sol, stats = solve_van_der_pol(lam, y0, (0.0, t_end), t_eval=np.linspace(0, t_end, num_points),
+                                       **kwargs)
+        stats['lam'] = lam
+        results.append((lam, sol, stats))
+        if progress is not None:
+            progress(lam, stats)
+    return results
+
+
+def format_stats(stats):
+    """Сводка расчета одной строкой"""
+    line = (f"{stats['method']:>6}: шагов {stats['n_steps']:>8}, f {stats['nfev']:>8}, "
+            f"J {stats['njev']:>5}, LU {stats['nlu']:>6}, {stats['seconds']:.3f} с")
+    if 'explicit_steps' in stats:
+        line += f" (явному методу ~{stats['explicit_steps']:.0f} шагов)"
+    if 'lam' in stats:
+        line = f"λ = {stats['lam']:g}: " + line
+    return line
@@ -0,0 +1,192 @@
+"""Хранилище длинных траекторий на диске.
+
+Траектория из 10^8-10^9 шагов не помещается в память, поэтому она пишется
+блоками по chunk_steps шагов в файл .npy: для записи в память отображается
+только участок файла текущего блока (np.memmap со смещением), поэтому
+занятая память не растет с длиной траектории. Рядом с данными хранится meta.json с
+параметрами расчета и числом уже записанных шагов; он обновляется после
+сброса каждого блока на диск, поэтому прерванный расчет продолжается с
+последнего записанного блока. Для анализа и графиков хранилище открывается
+только на чтение, срезы states[...] - представления memmap без копирования.
+
+Каталог хранилища:
+    states.npy  - массив (num_steps, d) состояний в моменты t0 + i*h
+    meta.json   - {"rhs", "args", "h", "t0", "state0", "num_steps", "done", ...}
+
+Запуск из командной строки (из корня репозитория):
+    python -m dynamics.store run lorenz_1e8 --steps 100000000 --r 28
+    python -m dynamics.store info lorenz_1e8
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from dynamics import jit
+from dynamics.rk4 import rk4_integrate
+from dynamics.systems import lorenz_derivs
+
+STATES_FILE = 'states.npy'
+META_FILE = 'meta.json'
+
+
+class TrajectoryStore:
+    def __init__(self, path):
+        """Открытие существующего хранилища; states - memmap только для чтения"""
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.states = np.load(os.path.join(path, STATES_FILE), mmap_mode='r')
+
+    @classmethod
+    def create(cls, path, num_steps, state0, meta):
+        """Новое хранилище на num_steps шагов с начальным состоянием state0"""
+        os.makedirs(path, exist_ok=True)
+        state0 = np.asarray(state0, dtype=float)
+        states = np.lib.format.open_memmap(os.path.join(path, STATES_FILE), mode='w+',
+                                           dtype=np.float64, shape=(num_steps,) + state0.shape)
+        states[0] = state0
+        states.flush()
+        del states
+        meta = dict(meta, num_steps=num_steps, state0=state0.tolist(), done=1)
+        _write_meta(path, meta)
+        return cls(path)
+
+    @property
+    def done(self):
+        """Число уже записанных шагов (включая начальное состояние)"""
+        return self.meta['done']
+
+    @property
+    def complete(self):
+        return self.done == self.meta['num_steps']
+
+    def block(self, start, stop):
+        """Строки start..stop-1 для записи: отображение в память только этого участка файла"""
+        return np.memmap(self.states.filename, dtype=self.states.dtype, mode='r+',
+                         offset=self.states.offset + start * self.states.strides[0],
+                         shape=(stop - start,) + self.states.shape[1:])
+
+    def commit(self, done):
+        """Запись числа готовых шагов в meta.json (данные блока уже сброшены на диск)"""
+        self.meta['done'] = int(done)
+        _write_meta(self.path, self.meta)
+
+    def times(self, start=0, stop=None, step=1):
+        """Моменты времени для строк states[start:stop:step]"""
+        stop = self.done if stop is None else stop
+        return self.meta['t0'] + self.meta['h'] * np.arange(start, stop, step)
+
+    def window(self, t_start=None, t_end=None, max_points=None):
+        """
+        (t, states) на отрезке [t_start, t_end] из уже записанной части.
+        max_points прореживает данные шагом по строкам; states остается
+        представлением memmap без копирования.
+        """
+        t0, h = self.meta['t0'], self.meta['h']
+        start = 0 if t_start is None else max(0, int(np.ceil((t_start - t0) / h)))
+        stop = self.done if t_end is None else min(self.done, int(np.floor((t_end - t0) / h)) + 1)
+        step = 1
+        if max_points is not None and stop - start > max_points:
+            step = -(-(stop - start) // max_points)
+        return self.times(start, stop, step), self.states[start:stop:step]
+
+
+def _write_meta(path, meta):
+    # Сначала во временный файл: прерывание не оставляет испорченный meta.json
+    partial = os.path.join(path, META_FILE + '.part')
+    with open(partial, 'w') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(partial, os.path.join(path, META_FILE))
+
+
+def _rhs_name(rhs):
+    return f"{rhs.__module__}.{rhs.__qualname__}"
+
+
+def integrate_to_store(path, rhs, state0, h, num_steps, args=(), t0=0.0,
+                       chunk_steps=1_000_000, progress=None):
+    """
+    Интегрирование RK4 с фиксированным шагом h одной траектории в хранилище path.
+    - rhs(state, *args, out=...): правая часть, как в dynamics.rk4; args - числа
+    - chunk_steps: шагов в одном блоке; в памяти одновременно только один блок
+    - progress(done, num_steps): вызывается после каждого записанного блока
+    Если хранилище уже есть и создано с теми же параметрами, расчет
+    продолжается с последнего записанного шага. Возвращает TrajectoryStore.
+    """
+    state0 = np.asarray(state0, dtype=float)
+    meta = {'rhs': _rhs_name(rhs), 'args': [float(a) for a in args], 'h': float(h),
+            't0': float(t0)}
+    if os.path.exists(os.path.join(path, META_FILE)):
+        store = TrajectoryStore(path)
+        expected = dict(meta, num_steps=num_steps, state0=state0.tolist())
+        stored = {key: store.meta.get(key) for key in expected}
+        if stored != expected:
+            raise ValueError(f"Хранилище {path} создано с другими параметрами: {stored}")
+    else:
+        store = TrajectoryStore.create(path, num_steps, state0, meta)
+
+    # Для Лоренца с numba блок считается скомпилированным циклом
+    compiled = jit.ENABLED and rhs is lorenz_derivs
+    if compiled:
+        r, sigma, b = jit.lorenz_params(*args)
+
+    while not store.complete:
+        # Блок начинается с последнего записанного состояния
+        start = store.done - 1
+        stop = min(start + chunk_steps, num_steps - 1)
+        block = store.block(start, stop + 1)
+        out = block[:, None]
+        if compiled:
+            jit.lorenz_trajectory(out, np.array([float(r)]), float(sigma), float(b), float(h))
+        else:
+            rk4_integrate(rhs, np.array(out[0]), h, len(out), args=args, out=out)
+        block.flush()
+        del block, out
+        store.commit(stop + 1)
+        if progress is not None:
+            progress(store.done, num_steps)
+    return store
+
+
+def integrate_lorenz(path, r=28.0, initial_state=(1.0, 1.0, 1.0), h=0.01, num_steps=10**6,
+                     sigma=10.0, b=8.0/3.0, chunk_steps=1_000_000, progress=None):
+    """Траектория системы Лоренца в хранилище path (см. integrate_to_store)"""
+    return integrate_to_store(path, lorenz_derivs, initial_state, h, num_steps,
+                              args=(r, sigma, b), chunk_steps=chunk_steps, progress=progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Длинные траектории Лоренца на диске")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="расчет или продолжение расчета")
+    run.add_argument('path', help="каталог хранилища")
+    run.add_argument('--steps', type=float, default=1e6, help="число шагов (можно 1e8)")
+    run.add_argument('--h', type=float, default=0.01, help="шаг интегрирования")
+    run.add_argument('--r', type=float, default=28.0, help="параметр r")
+    run.add_argument('--sigma', type=float, default=10.0, help="параметр σ")
+    run.add_argument('--b', type=float, default=8.0/3.0, help="параметр b")
+    run.add_argument('--x0', type=float, nargs=3, default=(1.0, 1.0, 1.0),
+                     metavar=('X', 'Y', 'Z'), help="начальное состояние")
+    run.add_argument('--chunk', type=int, default=1_000_000, help="шагов в блоке")
+    info = commands.add_parser('info', help="параметры и степень готовности")
+    info.add_argument('path', help="каталог хранилища")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        def report(done, total):
+            print(f"\rШаги: {done}/{total}", end='', flush=True)
+
+        store = integrate_lorenz(args.path, args.r, args.x0, args.h, int(args.steps),
+                                 args.sigma, args.b, chunk_steps=args.chunk, progress=report)
+        print(f"\nГотово: {store.path}")
+    else:
+        store = TrajectoryStore(args.path)
+        for key, value in store.meta.items():
+            print(f"{key}: {value}")
+        print(f"готово: {100 * store.done / store.meta['num_steps']:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
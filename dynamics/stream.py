@@ -0,0 +1,65 @@
+"""Траектории, выдаваемые блоками по мере интегрирования.
+
+Генераторы возвращают пары (t, states) для последовательных участков
+сетки времени, как только участок посчитан, поэтому рисовать можно
+начинать сразу, не дожидаясь всего отрезка. Первый блок маленький
+(first точек), следующие удваиваются до largest: первые точки появляются
+за миллисекунды при любой длине отрезка, а длинный хвост считается
+крупными блоками без лишних накладных расходов. Прервать расчет можно
+в любой момент, просто перестав запрашивать блоки (или вызвав close()).
+"""
+import numpy as np
+from scipy.integrate import odeint
+
+from dynamics import jit
+from dynamics.rk4 import rk4_integrate
+from dynamics.systems import lorenz_derivs
+
+
+def chunk_bounds(num_points, first=256, largest=16384):
+    """Границы (start, stop) блоков из num_points точек с удвоением размера"""
+    start, size = 0, first
+    while start < num_points:
+        stop = min(start + size, num_points)
+        yield start, stop
+        start, size = stop, min(2*size, largest)
+
+
+def odeint_chunks(func, y0, t, first=256, largest=16384, **kwargs):
+    """
+    Решение odeint(func, y0, t, **kwargs) блоками: каждый блок начинается
+    с последнего состояния предыдущего. Выдает (t[start:stop], states (n, d)).
+    """
+    t = np.asarray(t, dtype=float)
+    state = np.asarray(y0, dtype=float)
+    for start, stop in chunk_bounds(len(t), first, largest):
+        if start == 0:
+            states = odeint(func, state, t[:stop], **kwargs)
+        else:
+            states = odeint(func, state, t[start - 1:stop], **kwargs)[1:]
+        state = states[-1]
+        yield t[start:stop], states
+
+
+def rk4_chunks(rhs, state0, h, num_steps, args=(), t0=0.0, first=256, largest=16384):
+    """
+    num_steps точек RK4 с шагом h (как rk4_integrate) блоками; для Лоренца
+    с numba блоки считаются скомпилированным циклом. Выдает (t, states).
+    """
+    state = np.asarray(state0, dtype=float)
+    compiled = jit.ENABLED and rhs is lorenz_derivs and state.ndim == 1
+    if compiled:
+        r, sigma, b = jit.lorenz_params(*args)
+    for start, stop in chunk_bounds(num_steps, first, largest):
+        # Блок считается от последнего состояния предыдущего, которое само не выдается
+        first_row = 0 if start == 0 else 1
+        block = np.empty((stop - start + first_row,) + state.shape)
+        if compiled:
+            block[0] = state
+            jit.lorenz_trajectory(block[:, None], np.array([float(r)]), float(sigma),
+                                  float(b), float(h))
+        else:
+            rk4_integrate(rhs, state, h, len(block), args=args, out=block)
+        states = block[first_row:]
+        state = states[-1]
+        yield t0 + h * np.arange(start, stop), states
@@ -0,0 +1,167 @@
+"""Кеш линий тока фазовых портретов, зависящих от параметра μ.
+
+ax.streamplot заново интегрирует все линии тока при каждом вызове и
+обычно оказывается самой дорогой частью перерисовки. Здесь геометрия
+(ломаные линий тока и положения стрелок) считается один раз на отдельной
+фигуре, хранится в LRU-кеше по значению μ и затем только добавляется
+на оси готовыми объектами. Сетка значений μ может заполняться заранее
+в фоновом потоке; пока точного значения нет, можно показать ближайшее
+из готовых и дождаться уточнения.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import FancyArrowPatch
+
+
+def _polylines(segments):
+    """Склейка отрезков в ломаные: соседние отрезки одной линии имеют общий конец"""
+    lines = []
+    for segment in segments:
+        segment = np.asarray(segment)
+        if lines and len(segment) == 2 and np.array_equal(lines[-1][-1], segment[0]):
+            lines[-1].append(segment[1])
+        else:
+            lines.append(list(segment))
+    return [np.array(line) for line in lines]
+
+
+def streamline_geometry(rhs, mu, xlim, ylim, args=(), grid=(30, 20), density=1.5):
+    """
+    Линии тока поля rhs(state, mu, *args) на прямоугольнике xlim x ylim.
+    Возвращает (lines, arrows, extent): список ломаных (n, 2), массив стрелок
+    (k, 2, 2) с началом и концом каждой, расставленных так же, как в
+    ax.streamplot, и границы сетки (xmin, xmax, ymin, ymax).
+    """
+    x = np.linspace(*xlim, grid[0])
+    y = np.linspace(*ylim, grid[1])
+    state = np.stack(np.meshgrid(x, y), axis=-1)
+    derivs = rhs(state, mu, *args)
+
+    ax = Figure().add_subplot(111)
+    stream = ax.streamplot(state[..., 0], state[..., 1], derivs[..., 0], derivs[..., 1],
+                           density=density)
+    lines = _polylines(stream.lines.get_segments())
+
+    # Стрелка - в середине каждой линии по длине дуги, как в streamplot
+    arrows = []
+    for line in lines:
+        if len(line) < 2:
+            continue
+        length = np.cumsum(np.hypot(*np.diff(line, axis=0).T))
+        i = np.searchsorted(length, length[-1] / 2)
+        arrows.append((line[i], line[i:i + 2].mean(axis=0)))
+    return lines, np.array(arrows).reshape(-1, 2, 2), (*xlim, *ylim)
+
+
+def draw_streamlines(ax, geometry, color='gray', linewidth=None, arrowsize=1.0):
+    """Добавление готовой геометрии на оси вместо ax.streamplot"""
+    lines, arrows, (xmin, xmax, ymin, ymax) = geometry
+    if linewidth is None:
+        linewidth = rcParams['lines.linewidth']
+    collection = LineCollection(lines, colors=color, linewidths=linewidth)
+    # Как у streamplot: автомасштаб не добавляет полей за границами сетки
+    collection.sticky_edges.x[:] = [xmin, xmax]
+    collection.sticky_edges.y[:] = [ymin, ymax]
+    ax.add_collection(collection)
+    for tail, head in arrows:
+        ax.add_artist(FancyArrowPatch(tail, head, arrowstyle='-|>', color=color,
+                                     mutation_scale=10*arrowsize, linewidth=linewidth))
+    ax.autoscale_view()
+    return collection
+
+
+class StreamlineCache:
+    def __init__(self, rhs, xlim, ylim, args=(), grid=(30, 20), density=1.5, maxsize=256):
+        """
+        - rhs(state, mu, *args): поле на плоскости, состояние формы (..., 2)
+        - xlim, ylim, grid, density: как при прямом вызове streamplot
+        - maxsize: сколько значений μ хранится; при переполнении вытесняются
+          давно не использованные
+        """
+        self.rhs = rhs
+        self.xlim = xlim
+        self.ylim = ylim
+        self.args = args
+        self.grid = grid
+        self.density = density
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        # Очередь значений μ для фонового потока; request ставит значение в начало
+        self.pending = []
+        self.wakeup = threading.Condition(self.lock)
+        self.thread = None
+
+    @staticmethod
+    def key(mu):
+        # Значения слайдера отличаются в последних знаках, округление склеивает их
+        return round(float(mu), 6)
+
+    def get(self, mu):
+        """Геометрия для mu, если она уже посчитана, иначе None"""
+        key = self.key(mu)
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def nearest(self, mu):
+        """(μ, геометрия) для ближайшего посчитанного значения или None, если кеш пуст"""
+        with self.lock:
+            if not self.entries:
+                return None
+            key = min(self.entries, key=lambda k: abs(k - mu))
+            self.entries.move_to_end(key)
+            return key, self.entries[key]
+
+    def compute(self, mu):
+        """Расчет геометрии для mu с сохранением в кеш"""
+        key = self.key(mu)
+        geometry = streamline_geometry(self.rhs, key, self.xlim, self.ylim, self.args,
+                                       self.grid, self.density)
+        with self.lock:
+            self.entries[key] = geometry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return geometry
+
+    def lookup(self, mu):
+        """Геометрия для mu: из кеша или расчетом на месте"""
+        geometry = self.get(mu)
+        return geometry if geometry is not None else self.compute(mu)
+
+    def precompute(self, mu_values):
+        """Фоновое заполнение кеша для сетки значений μ"""
+        with self.lock:
+            self.pending.extend(self.key(mu) for mu in mu_values)
+            self.wakeup.notify()
+        self._start()
+
+    def request(self, mu):
+        """Расчет mu в фоне вне очереди (например, после отпускания слайдера)"""
+        with self.lock:
+            self.pending.insert(0, self.key(mu))
+            self.wakeup.notify()
+        self._start()
+
+    def _start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.pending:
+                    self.wakeup.wait()
+                mu = self.pending.pop(0)
+                done = mu in self.entries
+            if not done:
+                self.compute(mu)
@@ -0,0 +1,69 @@
+"""Параллельный перебор параметра r системы Лоренца.
+
+Значения r делятся на блоки, каждый блок интегрируется пакетным RK4
+в отдельном процессе. Результат пишется прямо в общий массив
+(multiprocessing.shared_memory), поэтому траектории не сериализуются
+и не передаются обратно через pickle.
+"""
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from dynamics.rk4 import solve_lorenz
+
+# Общий массив результатов в процессе-исполнителе
+_shared = None
+
+
+def _init_worker(name, shape):
+    global _shared
+    # Исполнители пула используют resource_tracker родителя, поэтому блок
+    # освобождается один раз - вызовом unlink() в sweep_lorenz
+    shm = shared_memory.SharedMemory(name=name)
+    _shared = (shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf))
+
+
+def _solve_chunk(task):
+    start, stop, r, ic, t_start, t_end, h, sigma, b = task
+    states = _shared[1]
+    solve_lorenz(r, ic, t_start, t_end, h, sigma=sigma, b=b, out=states[:, start:stop])
+    return start, stop
+
+
+def sweep_lorenz(r_values, initial_conditions, t_start, t_end, h,
+                 sigma=10.0, b=8.0/3.0, processes=None, chunk_size=None):
+    """
+    Интегрирование системы Лоренца для всех r_values на пуле процессов.
+    - initial_conditions: (3,) или (len(r_values), 3)
+    - chunk_size: число значений r в одном задании (по умолчанию - около
+      четырёх заданий на процесс)
+    Возвращает t формы (num_steps,) и состояния формы (num_steps, len(r_values), 3),
+    как solve_lorenz.
+    """
+    r_values = np.asarray(r_values, dtype=float).ravel()
+    n = len(r_values)
+    ic = np.broadcast_to(np.asarray(initial_conditions, dtype=float), (n, 3))
+    num_steps = int((t_end - t_start) / h)
+    t = np.linspace(t_start, t_end, num_steps)
+
+    processes = processes or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-n // (4 * processes)))
+
+    shape = (num_steps, n, 3)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    try:
+        tasks = [
+            (start, min(start + chunk_size, n), r_values[start:start + chunk_size],
+             ic[start:start + chunk_size], t_start, t_end, h, sigma, b)
+            for start in range(0, n, chunk_size)
+        ]
+        with Pool(processes, initializer=_init_worker, initargs=(shm.name, shape)) as pool:
+            for _ in pool.imap_unordered(_solve_chunk, tasks):
+                pass
+        states = np.ndarray(shape, dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return t, states
@@ -0,0 +1,206 @@
+"""Векторизованные правые части динамических систем.
+
+Состояние хранится в массиве формы (..., d): последняя ось - координаты,
+остальные - пакет траекторий. Параметры могут быть скалярами или
+массивами, совместимыми по форме с пакетом (например, (N,) для N траекторий).
+"""
+import numpy as np
+
+
+def lorenz_derivs(state, r, sigma=10.0, b=8.0/3.0, out=None):
+    """Производные системы Лоренца для массива состояний (..., 3)"""
+    if out is None:
+        out = np.empty_like(state)
+    x, y, z = state[..., 0], state[..., 1], state[..., 2]
+    dx, dy, dz = out[..., 0], out[..., 1], out[..., 2]
+
+    # dx/dt = sigma * (y - x)
+    np.subtract(y, x, out=dx)
+    dx *= sigma
+    # dy/dt = r * x - y - x * z  (dz временно хранит x * z)
+    np.multiply(x, z, out=dz)
+    np.multiply(r, x, out=dy)
+    dy -= y
+    dy -= dz
+    # dz/dt = x * y - b * z
+    np.multiply(x, y, out=dz)
+    dz -= b * z
+    return out
+
+
+def lorenz_jacobian(state, r, sigma=10.0, b=8.0/3.0, out=None):
+    """Матрица Якоби системы Лоренца, форма (..., 3, 3)"""
+    if out is None:
+        out = np.empty(state.shape + (3,))
+    x, y, z = state[..., 0], state[..., 1], state[..., 2]
+    out[..., 0, 0] = -sigma
+    out[..., 0, 1] = sigma
+    out[..., 0, 2] = 0.0
+    out[..., 1, 0] = r - z
+    out[..., 1, 1] = -1.0
+    out[..., 1, 2] = -x
+    out[..., 2, 0] = y
+    out[..., 2, 1] = x
+    out[..., 2, 2] = -b
+    return out
+
+
+def hopf_derivs(state, mu, omega=1.0, lambda_z=1.0, out=None):
+    """Нормальная форма бифуркации Андронова-Хопфа с затухающей координатой z"""
+    if out is None:
+        out = np.empty_like(state)
+    x, y, z = state[..., 0], state[..., 1], state[..., 2]
+    growth = mu - (x**2 + y**2)
+    out[..., 0] = growth*x - omega*y
+    out[..., 1] = omega*x + growth*y
+    out[..., 2] = -lambda_z*z
+    return out
+
+
+def hopf_jacobian(state, mu, omega=1.0, lambda_z=1.0, out=None):
+    """Матрица Якоби нормальной формы Хопфа, форма (..., 3, 3)"""
+    if out is None:
+        out = np.empty(state.shape + (3,))
+    x, y = state[..., 0], state[..., 1]
+    growth = mu - (x**2 + y**2)
+    out[..., 0, 0] = growth - 2*x**2
+    out[..., 0, 1] = -2*x*y - omega
+    out[..., 0, 2] = 0.0
+    out[..., 1, 0] = omega - 2*x*y
+    out[..., 1, 1] = growth - 2*y**2
+    out[..., 1, 2] = 0.0
+    out[..., 2, 0] = 0.0
+    out[..., 2, 1] = 0.0
+    out[..., 2, 2] = -lambda_z
+    return out
+
+
+def van_der_pol_derivs(state, lam, out=None):
+    """Уравнение Ван-дер-Поля: x' = y, y' = (λ - x²)y - x"""
+    if out is None:
+        out = np.empty_like(state)
+    x, y = state[..., 0], state[..., 1]
+    out[..., 0] = y
+    out[..., 1] = (lam - x**2)*y - x
+    return out
+
+
+def van_der_pol_jacobian(state, lam, out=None):
+    """Матрица Якоби уравнения Ван-дер-Поля, форма (..., 2, 2)"""
+    if out is None:
+        out = np.empty(state.shape + (2,))
+    x, y = state[..., 0], state[..., 1]
+    out[..., 0, 0] = 0.0
+    out[..., 0, 1] = 1.0
+    out[..., 1, 0] = -2*x*y - 1
+    out[..., 1, 1] = lam - x**2
+    return out
+
+
+def double_pendulum_derivs(state, L1=1.0, L2=1.0, m1=2.0, m2=1.0, g=9.81, out=None):
+    """
+    Двойной маятник, состояние (θ1, ω1, θ2, ω2).
+    Формулы совпадают с DoublePendulum.equations из chapter 4/4_32.py.
+    """
+    if out is None:
+        out = np.empty_like(state)
+    theta1, omega1, theta2, omega2 = state[..., 0], state[..., 1], state[..., 2], state[..., 3]
+    delta = theta2 - theta1
+    sin_d, cos_d = np.sin(delta), np.cos(delta)
+
+    denom = (m1 + m2 - m2*cos_d**2)
+    domega1 = ((m2 * L1 * omega1**2 * sin_d * cos_d
+               + m2 * g * np.sin(theta2) * cos_d +
+               m2 * L2 * omega2**2 * sin_d - (m1 + m2)*g*np.sin(theta1))
+                / (L1 * denom))
+    domega2 = ((-m2 * L2 * omega2**2 * sin_d * cos_d
+               + (m2 + m2)*(g * np.sin(theta1) * cos_d
+                - L1 * omega1**2 * sin_d - g*np.sin(theta2)))
+                / (L2 * denom))
+
+    out[..., 0] = omega1
+    out[..., 1] = domega1
+    out[..., 2] = omega2
+    out[..., 3] = domega2
+    return out
+
+
+def double_pendulum_jacobian(state, L1=1.0, L2=1.0, m1=2.0, m2=1.0, g=9.81, out=None):
+    """Матрица Якоби double_pendulum_derivs, форма (..., 4, 4)"""
+    if out is None:
+        out = np.empty(state.shape + (4,))
+    theta1, omega1, theta2, omega2 = state[..., 0], state[..., 1], state[..., 2], state[..., 3]
+    delta = theta2 - theta1
+    s, c = np.sin(delta), np.cos(delta)
+    sin1, cos1 = np.sin(theta1), np.cos(theta1)
+    sin2, cos2 = np.sin(theta2), np.cos(theta2)
+    M = m1 + m2
+    K = m2 + m2
+
+    D = M - m2*c**2
+    dD = 2*m2*c*s  # dD/dΔ; Δ = θ2 - θ1
+
+    # f1 = N1 / (L1 D)
+    N1 = m2*L1*omega1**2*s*c + m2*g*sin2*c + m2*L2*omega2**2*s - M*g*sin1
+    dN1_delta = m2*L1*omega1**2*(c**2 - s**2) - m2*g*sin2*s + m2*L2*omega2**2*c
+    dN1_theta1 = -dN1_delta - M*g*cos1
+    dN1_theta2 = dN1_delta + m2*g*cos2*c
+    # f2 = N2 / (L2 D)
+    N2 = -m2*L2*omega2**2*s*c + K*(g*sin1*c - L1*omega1**2*s - g*sin2)
+    dN2_delta = -m2*L2*omega2**2*(c**2 - s**2) - K*(g*sin1*s + L1*omega1**2*c)
+    dN2_theta1 = -dN2_delta + K*g*cos1*c
+    dN2_theta2 = dN2_delta - K*g*cos2
+
+    out[...] = 0.0
+    out[..., 0, 1] = 1.0
+    out[..., 2, 3] = 1.0
+    out[..., 1, 0] = (dN1_theta1*D + N1*dD) / (L1*D**2)
+    out[..., 1, 1] = 2*m2*L1*omega1*s*c / (L1*D)
+    out[..., 1, 2] = (dN1_theta2*D - N1*dD) / (L1*D**2)
+    out[..., 1, 3] = 2*m2*L2*omega2*s / (L1*D)
+    out[..., 3, 0] = (dN2_theta1*D + N2*dD) / (L2*D**2)
+    out[..., 3, 1] = -2*K*L1*omega1*s / (L2*D)
+    out[..., 3, 2] = (dN2_theta2*D - N2*dD) / (L2*D**2)
+    out[..., 3, 3] = -2*m2*L2*omega2*s*c / (L2*D)
+    return out
+
+
+def saddle_node_derivs(state, mu, y_sign=-1, out=None):
+    """Нормальная форма седло-узла: x' = μ + x², y' = ±y"""
+    if out is None:
+        out = np.empty_like(state)
+    x, y = state[..., 0], state[..., 1]
+    out[..., 0] = mu + x**2
+    out[..., 1] = y_sign*y
+    return out
+
+
+def saddle_node_jacobian(state, mu, y_sign=-1, out=None):
+    """Матрица Якоби saddle_node_derivs, форма (..., 2, 2)"""
+    if out is None:
+        out = np.empty(state.shape + (2,))
+    out[..., 0, 0] = 2*state[..., 0]
+    out[..., 0, 1] = 0.0
+    out[..., 1, 0] = 0.0
+    out[..., 1, 1] = y_sign
+    return out
+
+
+def pitchfork_derivs(state, mu, out=None):
+    """Нормальная форма бифуркации вилки: x' = μx - x³, y' = -y"""
+    if out is None:
+        out = np.empty_like(state)
+    x, y = state[..., 0], state[..., 1]
+    out[..., 0] = mu*x - x**3
+    out[..., 1] = -y
+    return out
+
+def pitchfork_jacobian(state, mu, out=None):
+    """Матрица Якоби pitchfork_derivs, форма (..., 2, 2)"""
+    if out is None:
+        out = np.empty(state.shape + (2,))
+    out[..., 0, 0] = mu - 3*state[..., 0]**2
+    out[..., 0, 1] = 0.0
+    out[..., 1, 0] = 0.0
+    out[..., 1, 1] = -1.0
+    return out
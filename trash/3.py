@@ -1,46 +1,57 @@
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dynamics.equilibria import classify, equilibria_at, stability_color, trace_branches
+from dynamics.streamcache import StreamlineCache, draw_streamlines
+from dynamics.systems import (pitchfork_derivs, pitchfork_jacobian,
+                              saddle_node_derivs, saddle_node_jacobian)
+
 # Настройка стиля графиков
 # plt.style.use('seaborn')
 
+# Линии тока для каждого μ считаются один раз и берутся из кеша
+saddle_node_streams = {
+    y_sign: StreamlineCache(saddle_node_derivs, (-2, 2), (-1, 1), args=(y_sign,))
+    for y_sign in (-1, 1)
+}
+pitchfork_streams = StreamlineCache(pitchfork_derivs, (-2, 2), (-1, 1))
+
+# Ветви равновесий на μ из [-1, 1], прослеженные продолжением по параметру
+seeds = np.stack(np.meshgrid(np.linspace(-2, 2, 9), np.linspace(-1, 1, 5)), axis=-1).reshape(-1, 2)
+saddle_node_branches = {
+    y_sign: trace_branches(saddle_node_derivs, saddle_node_jacobian, seeds, (-1, 1), args=(y_sign,))
+    for y_sign in (-1, 1)
+}
+pitchfork_branches = trace_branches(pitchfork_derivs, pitchfork_jacobian, seeds, (-1, 1))
+
+def plot_equilibria(ax, branches, mu, rhs, jac, args=()):
+    """Точки равновесия при данном mu, цвет и подпись - по типу точки"""
+    points = equilibria_at(branches, mu, rhs, jac, args)
+    kinds, _ = classify(jac(points, mu, *args))
+    labeled = set()
+    for (x, y), kind in zip(points, kinds):
+        label = None if kind in labeled else kind.capitalize()
+        labeled.add(kind)
+        ax.plot(x, y, 'o', color=stability_color(kind), markersize=8, label=label)
+
 def plot_saddle_node(mu, y_sign=-1, ax=None):
     """
     Бифуркация седло-узел:
     - mu: параметр бифуркации
     - y_sign: -1 (устойчивый узел) или 1 (неустойчивый узел)
     """
-    # Создаем сетку
-    x = np.linspace(-2, 2, 30)
-    y = np.linspace(-1, 1, 20)
-    X, Y = np.meshgrid(x, y)
-    
-    # Динамика системы
-    DX = mu + X**2
-    DY = y_sign * Y
-    
-    # Точки равновесия
-    eq_points = []
-    if mu < 0:
-        eq_points.append((-np.sqrt(-mu), 0))  # Устойчивый узел (зеленый)
-        eq_points.append((np.sqrt(-mu), 0))   # Седло (красный)
-    elif mu == 0:
-        eq_points.append((0, 0))              # Седло-узел (оранжевый)
-
     # Построение фазового портрета
     if ax is None:
         fig, ax = plt.subplots(figsize=(6, 4))
     
-    ax.streamplot(X, Y, DX, DY, color='gray', density=1.5)
+    draw_streamlines(ax, saddle_node_streams[y_sign].lookup(mu), color='gray')
     
     # Рисуем точки равновесия
-    for (x, y) in eq_points:
-        if x == np.sqrt(-mu) and mu < 0:
-            ax.plot(x, y, 'ro', markersize=8, label='Седло')  # Седло
-        else:
-            ax.plot(x, y, 'go', markersize=8, label='Узел')   # Узел
-    if mu == 0:
-        ax.plot(0, 0, 'o', color='orange', markersize=8, label='Седло-узел')
+    plot_equilibria(ax, saddle_node_branches[y_sign], mu, saddle_node_derivs,
+                    saddle_node_jacobian, (y_sign,))
     return ax
 
 def plot_pitchfork(mu, ax=None):
@@ -48,36 +59,14 @@ def plot_pitchfork(mu, ax=None):
     Бифуркация вилка:
     - mu: параметр бифуркации
     """
-    # Создаем сетку
-    x = np.linspace(-2, 2, 30)
-    y = np.linspace(-1, 1, 20)
-    X, Y = np.meshgrid(x, y)
-    
-    # Динамика системы
-    DX = mu*X - X**3
-    DY = -Y
-    
-    # Точки равновесия
-    eq_points = []
-    if mu <= 0:
-        eq_points.append((0, 0))                     # Устойчивый узел
-    else:
-        eq_points.append((0, 0))                     # Седло
-        eq_points.append((np.sqrt(mu), 0))            # Устойчивые узлы
-        eq_points.append((-np.sqrt(mu), 0))
-
     # Построение фазового портрета
     if ax is None:
         fig, ax = plt.subplots(figsize=(6, 4))
     
-    ax.streamplot(X, Y, DX, DY, color='gray', density=1.5)
+    draw_streamlines(ax, pitchfork_streams.lookup(mu), color='gray')
     
     # Рисуем точки равновесия
-    for (x, y) in eq_points:
-        if x == 0 and mu > 0:
-            ax.plot(x, y, 'ro', markersize=8, label='Седло')
-        else:
-            ax.plot(x, y, 'go', markersize=8, label='Узел')
+    plot_equilibria(ax, pitchfork_branches, mu, pitchfork_derivs, pitchfork_jacobian)
     
     ax.set_title(f"Вилка ($\mu = {mu}$)")
     ax.set_xlabel("x")